@@ -0,0 +1,235 @@
+import abc
+import collections
+import json
+import subprocess
+import sys
+import threading
+import time
+
+# Title fragment of the PowerPoint presenter window
+SLIDESHOW_TITLE = "PowerPoint Slide Show"
+# Opened by the "open_music" action
+MUSIC_APP = 'mswindowsmusic:'
+# Entries kept in memory by a RecordingBackend (older ones are discarded)
+MAX_LOG_ENTRIES = 10000
+
+class ActionBackend(abc.ABC):
+    """The OS actions the gesture sequences can trigger.
+
+    `slide` and `focus_window` return False when there is no matching
+    window; the other methods return nothing.
+    """
+
+    @abc.abstractmethod
+    def media_key(self, key):
+        """Press a media key: 'play_pause', 'next_track' or 'previous_track'"""
+
+    @abc.abstractmethod
+    def volume(self, direction):
+        """'up' or 'down' by one step"""
+
+    def slide(self, direction):
+        """'next' or 'previous' slide of the running slide show"""
+        if not self.focus_window(SLIDESHOW_TITLE):
+            return False
+        self.arrow_key('right' if direction == 'next' else 'left')
+        return True
+
+    @abc.abstractmethod
+    def arrow_key(self, key):
+        """Press 'left' or 'right'"""
+
+    @abc.abstractmethod
+    def launch(self, target):
+        """Open an app or URI"""
+
+    @abc.abstractmethod
+    def focus_window(self, title):
+        """Bring the first visible window whose title contains `title` to the front"""
+
+class WindowsBackend(ActionBackend):
+    """win32 key events and window focus.
+
+    The handle of each focused window is cached by title and only checked
+    (still a window, visible, same title) on the next call, so a slide
+    change does not enumerate every top-level window.
+    """
+
+    def __init__(self):
+        import win32api
+        import win32con
+        import win32gui
+        self.win32api, self.win32con, self.win32gui = win32api, win32con, win32gui
+        self.keys = {
+            'play_pause': win32con.VK_MEDIA_PLAY_PAUSE,
+            'next_track': win32con.VK_MEDIA_NEXT_TRACK,
+            'previous_track': win32con.VK_MEDIA_PREV_TRACK,
+            'up': win32con.VK_VOLUME_UP,
+            'down': win32con.VK_VOLUME_DOWN,
+            'right': win32con.VK_RIGHT,
+            'left': win32con.VK_LEFT,
+        }
+        self._windows = {}
+        self.window_lookups = 0
+
+    def _press(self, vk):
+        self.win32api.keybd_event(vk, 0, 0, 0)
+        self.win32api.keybd_event(vk, 0, self.win32con.KEYEVENTF_KEYUP, 0)
+
+    def media_key(self, key):
+        self._press(self.keys[key])
+
+    def volume(self, direction):
+        self._press(self.keys[direction])
+
+    def arrow_key(self, key):
+        self._press(self.keys[key])
+
+    def launch(self, target):
+        subprocess.Popen(['start', target], shell=True)
+
+    def _is_match(self, hwnd, title):
+        win32gui = self.win32gui
+        return win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd) and title in win32gui.GetWindowText(hwnd)
+
+    def _find_window(self, title):
+        def enum_handler(hwnd, result):
+            if self.win32gui.IsWindowVisible(hwnd) and title in self.win32gui.GetWindowText(hwnd):
+                result.append(hwnd)
+        result = []
+        self.window_lookups += 1
+        self.win32gui.EnumWindows(enum_handler, result)
+        return result[0] if result else None
+
+    def focus_window(self, title):
+        hwnd = self._windows.get(title)
+        if hwnd is None or not self._is_match(hwnd, title):
+            hwnd = self._find_window(title)
+            if hwnd is None:
+                self._windows.pop(title, None)
+                return False
+            self._windows[title] = hwnd
+        self.win32gui.SetForegroundWindow(hwnd)
+        return True
+
+class PyAutoGuiBackend(ActionBackend):
+    """pyautogui key presses and pygetwindow focus, for platforms without win32"""
+
+    KEYS = {'play_pause': 'playpause', 'next_track': 'nexttrack', 'previous_track': 'prevtrack',
+            'up': 'volumeup', 'down': 'volumedown'}
+
+    def __init__(self):
+        import pyautogui  # slow to load, so only imported when this backend is used
+        self.pyautogui = pyautogui
+
+    def media_key(self, key):
+        self.pyautogui.press(self.KEYS[key])
+
+    def volume(self, direction):
+        self.pyautogui.press(self.KEYS[direction])
+
+    def arrow_key(self, key):
+        self.pyautogui.press(key)
+
+    def launch(self, target):
+        if sys.platform == 'win32':
+            subprocess.Popen(['start', target], shell=True)
+        else:
+            subprocess.Popen(['xdg-open' if sys.platform != 'darwin' else 'open', target])
+
+    def focus_window(self, title):
+        try:
+            import pygetwindow
+            windows = pygetwindow.getWindowsWithTitle(title)
+        except Exception:
+            return False
+        if not windows:
+            return False
+        windows[0].activate()
+        return True
+
+class RecordingBackend(ActionBackend):
+    """Record actions with timestamps instead of sending them to the OS.
+
+    Each entry is {"t": clock(), "action": method, "arg": argument}. The
+    last `max_log` entries are kept in `log` (None keeps all of them); with
+    `path`, every entry is also appended to that file as JSON lines. Window
+    lookups always succeed, so every sequence completes as it would with a
+    slide show open.
+    """
+
+    def __init__(self, path=None, clock=time.perf_counter, max_log=MAX_LOG_ENTRIES):
+        self.clock = clock
+        self.log = collections.deque(maxlen=max_log)
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def _record(self, action, arg):
+        entry = {'t': self.clock(), 'action': action, 'arg': arg}
+        with self._lock:
+            self.log.append(entry)
+            if self._file is not None:
+                self._file.write(json.dumps(entry) + '\n')
+                self._file.flush()
+
+    def media_key(self, key):
+        self._record('media_key', key)
+
+    def volume(self, direction):
+        self._record('volume', direction)
+
+    def arrow_key(self, key):
+        self._record('arrow_key', key)
+
+    def launch(self, target):
+        self._record('launch', target)
+
+    def focus_window(self, title):
+        self._record('focus_window', title)
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+BACKENDS = {
+    'windows': WindowsBackend,
+    'pyautogui': PyAutoGuiBackend,
+    'recording': RecordingBackend,
+}
+
+def make_backend(name='auto'):
+    """Backend by name; 'auto' is 'windows' on Windows, else 'pyautogui'.
+
+    A backend named explicitly must load, or this raises; with 'auto', one
+    that fails to load is replaced by a RecordingBackend with a warning, so
+    the gestures still run but no action reaches the OS.
+    """
+    if name not in BACKENDS and name != 'auto':
+        raise ValueError(f"Unknown action backend '{name}', expected 'auto' or one of {tuple(BACKENDS)}.")
+    chosen = name if name != 'auto' else 'windows' if sys.platform == 'win32' else 'pyautogui'
+    try:
+        return BACKENDS[chosen]()
+    except Exception as e:
+        # e.g. win32 missing, or pyautogui without a display
+        if name != 'auto':
+            raise RuntimeError(f"Action backend '{chosen}' could not be loaded: {e}") from e
+        print(f"WARNING: action backend '{chosen}' could not be loaded ({e}). "
+              f"Actions are only recorded and will NOT be sent to the OS.")
+        return RecordingBackend()
+
+def backend_actions(backend):
+    """The named actions of the mode handlers, bound to a backend"""
+    return {
+        'play_pause': lambda: backend.media_key('play_pause'),
+        'next_track': lambda: backend.media_key('next_track'),
+        'previous_track': lambda: backend.media_key('previous_track'),
+        'volume_up': lambda: backend.volume('up'),
+        'volume_down': lambda: backend.volume('down'),
+        'open_music': lambda: backend.launch(MUSIC_APP),
+        'next_slide': lambda: backend.slide('next'),
+        'previous_slide': lambda: backend.slide('previous'),
+    }
+
+# Names a sequence's "action" can take (nothing is called without a backend)
+ACTION_NAMES = frozenset(backend_actions(None))
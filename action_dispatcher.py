@@ -0,0 +1,82 @@
+import collections
+import threading
+import time
+
+class ActionDispatcher:
+    """Run OS actions on a worker thread so the frame loop never waits for them.
+
+    Actions run one at a time in the order they were submitted. A repeat of
+    the same action within `debounce` seconds of the last accepted one is
+    dropped. `perform(name)` does the work and returns False when the action
+    could not be carried out, in which case `on_failure(name)` is called
+    (from the worker thread). `on_done(name, seconds)` receives the time
+    from submission to the end of each action.
+    """
+
+    def __init__(self, perform, debounce=0.2, on_failure=None, on_done=None):
+        self.perform = perform
+        self.debounce = debounce
+        self.on_failure = on_failure
+        self.on_done = on_done
+        self.submitted = 0
+        self.debounced = 0
+        self.executed = 0
+        self.failed = 0
+        self.max_wait = 0.0
+        self._last_accepted = {}
+        self._pending = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='ActionDispatcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, name):
+        """Queue an action; returns False if it was debounced"""
+        now = time.monotonic()
+        with self._condition:
+            self.submitted += 1
+            last = self._last_accepted.get(name)
+            if last is not None and now - last < self.debounce:
+                self.debounced += 1
+                return False
+            self._last_accepted[name] = now
+            self._pending.append((name, now))
+            self._condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                name, submitted_at = self._pending.popleft()
+            self.max_wait = max(self.max_wait, time.monotonic() - submitted_at)
+            try:
+                ok = self.perform(name) is not False
+            except Exception as e:
+                print(f"Action '{name}' failed: {e}")
+                ok = False
+            self.executed += 1
+            if self.on_done is not None:
+                self.on_done(name, time.monotonic() - submitted_at)
+            if not ok:
+                self.failed += 1
+                if self.on_failure is not None:
+                    self.on_failure(name)
+
+    def close(self, timeout=2.0):
+        """Finish the queued actions (up to `timeout` seconds) and stop the worker"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'debounced': self.debounced,
+            'executed': self.executed,
+            'failed': self.failed,
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+        }
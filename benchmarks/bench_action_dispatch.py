@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from action_dispatcher import ActionDispatcher
+
+FRAMES = 90
+FRAME_TIME = 1 / 30
+ACTION_EVERY = 15        # frames between two triggered actions
+ACTION_DURATION = 0.25   # e.g. EnumWindows scan + focus, or launching an app
+
+def slow_action(name):
+    time.sleep(ACTION_DURATION)
+
+def run_loop(perform):
+    """Frame loop at 30 fps triggering an action every ACTION_EVERY frames; returns the frame gaps in ms"""
+    gaps = []
+    last = time.perf_counter()
+    for frame in range(FRAMES):
+        time.sleep(FRAME_TIME)  # stands in for capture + recognition
+        if frame % ACTION_EVERY == 0:
+            perform('next_slide')
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+    return sorted(gaps)
+
+def main():
+    inline = run_loop(slow_action)
+    dispatcher = ActionDispatcher(slow_action, debounce=0.0)
+    dispatched = run_loop(dispatcher.submit)
+    dispatcher.close(timeout=FRAMES * ACTION_DURATION)
+    print(f"{FRAMES} frames at 30 fps, a {ACTION_DURATION * 1000:.0f} ms action every {ACTION_EVERY} frames")
+    print(f"{'actions':<14}{'frame p50 ms':>14}{'frame max ms':>14}")
+    for name, gaps in (('inline', inline), ('dispatcher', dispatched)):
+        print(f"{name:<14}{gaps[len(gaps) // 2]:>14.1f}{gaps[-1]:>14.1f}")
+    print(f"Dispatcher: {dispatcher.stats()}")
+
+if __name__ == "__main__":
+    main()
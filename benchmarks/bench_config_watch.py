@@ -0,0 +1,95 @@
+import builtins
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Only the standard library is needed, so synthetic.py (numpy) is not imported for the path setup
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from config_watcher import ConfigWatcher
+
+FPS = 30
+SECONDS = 5.0
+
+class FileCallCounter:
+    """Count open() and os.stat() calls made by this process while active"""
+
+    def __enter__(self):
+        self.opens = 0
+        self.stats = 0
+        self._syscr = read_syscalls()
+        self._open, self._stat = builtins.open, os.stat
+
+        def counting_open(*args, **kwargs):
+            self.opens += 1
+            return self._open(*args, **kwargs)
+
+        def counting_stat(*args, **kwargs):
+            self.stats += 1
+            return self._stat(*args, **kwargs)
+        builtins.open, os.stat = counting_open, counting_stat
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open, os.stat = self._open, self._stat
+        self.read_syscalls = read_syscalls() - self._syscr if self._syscr is not None else None
+
+def read_syscalls():
+    """read() syscalls made by this process so far (Linux only)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('syscr:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+def run_frames(per_frame):
+    frames = int(FPS * SECONDS)
+    for _ in range(frames):
+        per_frame()
+        time.sleep(1 / FPS)
+    return frames
+
+def read_every_frame():
+    """What the control loops used to do at the end of every frame"""
+    def per_frame():
+        with open('mode_config.json', 'r') as f:
+            json.load(f).get('current_mode', 'VIDEO')
+    return run_frames(per_frame)
+
+def watch_changes():
+    watcher = ConfigWatcher(interval=0.2)
+    mode_file = watcher.watch('mode_config.json')
+    watcher.watch('config.json')
+    watcher.start()
+    try:
+        return run_frames(lambda: mode_file.value.get('current_mode', 'VIDEO'))
+    finally:
+        watcher.stop()
+
+def main():
+    root = ROOT_DIR
+    workdir = tempfile.mkdtemp()
+    try:
+        for name in ('mode_config.json', 'config.json'):
+            shutil.copy(os.path.join(root, name), workdir)
+        os.chdir(workdir)
+        print(f"{SECONDS:.0f}s of a {FPS} fps loop")
+        print(f"{'mode check':<26}{'open()':>8}{'os.stat()':>11}{'read syscalls':>15}")
+        for name, run in (('json.load every frame', read_every_frame), ('ConfigWatcher (0.2s)', watch_changes)):
+            with FileCallCounter() as counter:
+                run()
+            syscalls = counter.read_syscalls if counter.read_syscalls is not None else 'n/a'
+            print(f"{name:<26}{counter.opens:>8}{counter.stats:>11}{syscalls:>15}")
+    finally:
+        os.chdir(root)
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    sys.exit(main())
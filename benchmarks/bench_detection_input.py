@@ -0,0 +1,68 @@
+import sys
+import time
+import numpy as np
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+import cv2
+import mediapipe as mp
+from systerm_control_by_handgesture import DetectionInput
+
+MAX_FRAMES = 300
+MODES = {
+    'full': {'mode': 'full'},
+    'downscale 0.5': {'mode': 'downscale', 'scale': 0.5},
+    'roi': {'mode': 'roi'},
+}
+
+def load_frames(source):
+    """Mirrored frames from a video file (e.g. recorded_gestures/*.mp4) or the camera"""
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < MAX_FRAMES:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+def run(frames, config):
+    hands = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.8, min_tracking_confidence=0.9)
+    detection_input = DetectionInput.from_config(config)
+    timings = []
+    landmarks = []
+    for frame in frames:
+        start = time.perf_counter()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = detection_input.process(hands, rgb_frame)
+        timings.append(time.perf_counter() - start)
+        if results.multi_hand_landmarks:
+            hand = results.multi_hand_landmarks[0]
+            landmarks.append(np.array([[p.x, p.y, p.z] for p in hand.landmark]))
+        else:
+            landmarks.append(None)
+    hands.close()
+    return np.array(timings) * 1000, landmarks, detection_input.fallbacks
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else '0'
+    frames = load_frames(source)
+    if not frames:
+        print(f"Error: no frames could be read from '{source}'.")
+        return 1
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} from '{source}'")
+    print(f"{'mode':<16}{'p50 ms':>8}{'p95 ms':>8}{'hands':>8}{'xy err vs full':>16}{'fallbacks':>11}")
+    reference = None
+    for name, config in MODES.items():
+        timings, landmarks, fallbacks = run(frames, config)
+        if reference is None:
+            reference = landmarks
+        errors = [np.abs(a[:, :2] - b[:, :2]).mean() for a, b in zip(landmarks, reference)
+                  if a is not None and b is not None]
+        detected = sum(l is not None for l in landmarks) / len(landmarks)
+        error = f"{np.mean(errors):.4f}" if errors else 'n/a'
+        print(f"{name:<16}{np.percentile(timings, 50):>8.2f}{np.percentile(timings, 95):>8.2f}"
+              f"{detected:>8.0%}{error:>16}{fallbacks:>11}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
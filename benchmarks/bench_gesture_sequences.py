@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from sequence_engine import compile_sequences
+
+GESTURES = {1: "Closed_Fist", 2: "Open_Palm", 3: "Pointing_Up", 4: "Thumb_Down",
+            5: "Thumb_Up", 6: "Victory", 7: "ILoveYou"}
+SEQUENCE_COUNTS = (5, 50, 500)
+FRAMES = 200000
+
+def make_sequences(count, rng):
+    """`count` distinct sequences of 2-6 steps, none the start of another"""
+    names = list(GESTURES.values())
+    seen = set()
+    sequences = []
+    while len(sequences) < count:
+        steps = [rng.choice(names)]
+        while len(steps) < rng.randint(2, 6):
+            steps.append(rng.choice([name for name in names if name != steps[-1]]))
+        steps = tuple(steps)
+        if any(steps[:i] in seen for i in range(1, len(steps) + 1)) \
+                or any(other[:len(steps)] == steps for other in seen):
+            continue
+        seen.add(steps)
+        sequences.append({"steps": list(steps), "action": f"action_{len(sequences)}"})
+    return sequences
+
+class LinearMatcher:
+    """The previous approach: one gesture queue per sequence, all checked every frame"""
+
+    def __init__(self, sequences):
+        ids = {name: gesture for gesture, name in GESTURES.items()}
+        self.templates = [([ids[name] for name in entry["steps"]], entry["action"]) for entry in sequences]
+        self.queues = None
+
+    def advance(self, gesture, now):
+        if self.queues is None:
+            self.queues = [steps[1:] for steps, _ in self.templates if steps[0] == gesture]
+            self.actions = [action for steps, action in self.templates if steps[0] == gesture]
+            if not self.queues:
+                self.queues = None
+            return ()
+        for queue, action in zip(self.queues, self.actions):
+            if queue[0] == gesture:
+                queue.pop(0)
+                if not queue:
+                    self.queues = None
+                    return (('action', action),)
+        return ()
+
+def run(matcher, stream):
+    fired = 0
+    start = time.perf_counter()
+    for now, gesture in enumerate(stream):
+        if matcher.advance(gesture, now):
+            fired += 1
+    return (time.perf_counter() - start) / len(stream) * 1e9, fired
+
+def main():
+    rng = random.Random(0)
+    stream = [rng.randint(1, len(GESTURES)) for _ in range(FRAMES)]
+    print(f"{FRAMES} random gestures; ns per frame")
+    print(f"{'sequences':>10}{'automaton':>12}{'linear':>12}{'fired':>8}")
+    for count in SEQUENCE_COUNTS:
+        sequences = make_sequences(count, rng)
+        automaton = compile_sequences({"timeout": None, "sequences": sequences}, GESTURES)
+        automaton_ns, fired = run(automaton, stream)
+        linear_ns, _ = run(LinearMatcher(sequences), stream)
+        print(f"{count:>10}{automaton_ns:>12.0f}{linear_ns:>12.0f}{fired:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import math
+import time
+import cv2
+import numpy as np
+import synthetic  # noqa: F401 (puts the repo root on sys.path)
+from idle_governor import ACTIVE, IDLE, IdleGovernor
+
+FPS = 30
+FRAME_SHAPE = (480, 640, 3)
+DETECT_SECONDS = 0.012   # CPU burnt per hand detection, roughly hands.process on a laptop
+# (seconds, hand in view) segments of the synthetic session
+SCRIPT = ((1.0, True), (6.0, False), (2.0, True), (3.0, False))
+
+def burn(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+def make_frames(rng):
+    """The session's two camera frames as JPEG, decoded per frame taken like an MJPEG webcam's"""
+    background = rng.integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    with_hand = background.copy()
+    with_hand[160:360, 240:400] = 220
+    return [cv2.imencode('.jpg', frame)[1] for frame in (background, with_hand)]
+
+def segment_at(t):
+    """(index, start, hand in view) of the SCRIPT segment at t seconds"""
+    start = 0.0
+    for index, (seconds, hand) in enumerate(SCRIPT):
+        if t < start + seconds:
+            return index, start, hand
+        start += seconds
+    return None
+
+def run(governor, frames):
+    """Play SCRIPT with a camera at FPS, the way CaptureSession.grab paces the loop.
+
+    Returns frames decoded, detections and, per hand appearance, the ms from
+    the hand appearing to the first detection that saw it.
+    """
+    background, with_hand = frames
+    decoded = detections = 0
+    wake_ms = {}
+    start = time.perf_counter()
+    while True:
+        if governor is not None:
+            time.sleep(governor.pace(None, time.perf_counter() - start))
+        # The next frame the camera delivers
+        now = time.perf_counter() - start
+        tick = math.ceil(now * FPS) / FPS
+        time.sleep(max(0.0, tick - now))
+        segment = segment_at(tick)
+        if segment is None:
+            break
+        index, segment_start, hand = segment
+        frame = cv2.imdecode(with_hand if hand else background, cv2.IMREAD_COLOR)
+        decoded += 1
+        if governor is None or governor.should_detect(frame, tick):
+            burn(DETECT_SECONDS)
+            detections += 1
+            if governor is not None:
+                governor.update(hand, tick)
+            if hand and index not in wake_ms:
+                wake_ms[index] = round((tick - segment_start) * 1000)
+    return decoded, detections, list(wake_ms.values())
+
+def main():
+    frames = make_frames(np.random.default_rng(0))
+    total = sum(seconds for seconds, _ in SCRIPT)
+    cpu = time.process_time()
+    decoded, detections, _ = run(None, frames)
+    baseline = (time.process_time() - cpu) / total * 60
+    print(f"{total:.0f} s at {FPS} fps, hand detection costs {DETECT_SECONDS * 1000:.0f} ms CPU")
+    print(f"No governor: {decoded} frames, {detections} detections, {baseline:.1f} CPU s/min")
+
+    # frame_interval=0 takes every frame while idle, like the governor before it paced the loop
+    for name, frame_interval in (('every frame', 0.0), ('paced', 0.1)):
+        governor = IdleGovernor(idle_after=1.0, detect_interval=0.5, frame_interval=frame_interval)
+        decoded, detections, wake_ms = run(governor, frames)
+        print(f"Governor, {name + ':':<12} {decoded} frames, {detections} detections, "
+              f"active {governor.cpu_per_minute(ACTIVE):.1f} CPU s/min, "
+              f"idle {governor.cpu_per_minute(IDLE):.1f} CPU s/min, "
+              f"hand detected {wake_ms} ms after it appeared")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import timeit
+import numpy as np
+from synthetic import synthetic_hands
+from landmark_utils import LandmarkBuffer
+
+CALLS = 20000
+
+def list_building(hand_landmarks):
+    """The code predict_gesture used before LandmarkBuffer"""
+    row = []
+    for landmark in hand_landmarks.landmark:
+        row.extend([landmark.x, landmark.y, landmark.z])
+    return np.asarray([row], dtype=np.float32)
+
+def main():
+    hands = synthetic_hands(2)
+    buffer = LandmarkBuffer(max_hands=2)
+    assert np.array_equal(list_building(hands[0]), buffer.fill_one(hands[0]))
+
+    cases = {
+        'list + np.asarray (1 hand)': lambda: list_building(hands[0]),
+        'LandmarkBuffer.fill_one (1 hand)': lambda: buffer.fill_one(hands[0]),
+        'list + np.asarray (2 hands)': lambda: np.vstack([list_building(h) for h in hands]),
+        'LandmarkBuffer.fill (2 hands)': lambda: buffer.fill(hands),
+    }
+    print(f"{'case':<36}{'us/call':>10}")
+    for name, call in cases.items():
+        seconds = min(timeit.repeat(call, number=CALLS, repeat=5))
+        print(f"{name:<36}{seconds / CALLS * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
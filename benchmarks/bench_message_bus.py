@@ -0,0 +1,116 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import message_bus
+from message import CHECK_INTERVAL_MS, send_message_to_file
+
+MESSAGES = 10
+MESSAGE_SPACING = 0.3
+HOT_PATH_CALLS = 200
+STOP = 'stop'
+
+def file_overlay(path, results):
+    """Poll the message file like MessageDisplayApp.check_for_updates and report when each message shows up"""
+    last = ""
+    while True:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                message = json.load(f).get('message')
+        except Exception:
+            message = None
+        if message == STOP:
+            break
+        if message is not None and message != last:
+            results.put((float(message), time.time()))
+            last = message
+        time.sleep(CHECK_INTERVAL_MS / 1000)
+    results.put(None)
+
+def bus_overlay(bus, results):
+    """Receive notifications like MessageDisplayApp.check_bus and report when each one arrives"""
+    endpoint = message_bus.connect(bus, 'message')
+    while True:
+        for topic, payload in endpoint.poll():
+            if topic == message_bus.NOTIFY:
+                if payload == STOP:
+                    results.put(None)
+                    return
+                results.put((float(payload), time.time()))
+        time.sleep(0.015)
+
+def broker(bus, stop):
+    """Forward published messages to the subscribers, like monitor_bus in main.py"""
+    endpoint = bus.endpoint(message_bus.BROKER)
+    while not stop.is_set():
+        message = endpoint.get(timeout=0.1)
+        if message is not None:
+            bus.deliver(*message)
+
+def delivery_latencies_ms(target, args, send):
+    """Latency of each message that reached the overlay (messages overwritten before a poll are lost)"""
+    results = multiprocessing.Queue()
+    overlay = multiprocessing.Process(target=target, args=args + (results,))
+    overlay.start()
+    time.sleep(1.0)  # let the overlay process start
+    for _ in range(MESSAGES):
+        send(repr(time.time()))
+        time.sleep(MESSAGE_SPACING)
+    time.sleep(CHECK_INTERVAL_MS / 1000)
+    send(STOP)
+    latencies = []
+    for item in iter(results.get, None):
+        sent, received = item
+        latencies.append((received - sent) * 1000)
+    overlay.join()
+    return sorted(latencies)
+
+def hot_path_us(send):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(HOT_PATH_CALLS):
+            send(f"Volume up {i}")
+    return (time.perf_counter() - start) / HOT_PATH_CALLS * 1e6
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'message.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"message": "", "status": "true"}, f)
+    bus = message_bus.MessageBus()
+    sender = bus.endpoint('control')
+    stop = threading.Event()
+    forwarder = threading.Thread(target=broker, args=(bus, stop), daemon=True)
+    forwarder.start()
+
+    def send_file(text):
+        with contextlib.redirect_stdout(io.StringIO()):
+            send_message_to_file(text, path)
+
+    def send_bus(text):
+        sender.publish(message_bus.NOTIFY, text)
+
+    file_latency = delivery_latencies_ms(file_overlay, (path,), send_file)
+    bus_latency = delivery_latencies_ms(bus_overlay, (bus,), send_bus)
+    file_cost = hot_path_us(send_file)
+    bus_cost = hot_path_us(send_bus)
+    stop.set()
+    forwarder.join()
+
+    print(f"{'transport':<16}{'send us':>10}{'shown':>8}{'delivery p50 ms':>18}{'delivery max ms':>18}")
+    for name, cost, latency in (('message.json', file_cost, file_latency), ('message bus', bus_cost, bus_latency)):
+        print(f"{name:<16}{cost:>10.1f}{f'{len(latency)}/{MESSAGES}':>8}"
+              f"{latency[len(latency) // 2]:>18.1f}{latency[-1]:>18.1f}")
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+import numpy as np
+from synthetic import synthetic_hands
+from overlay import FastRenderer, MediaPipeRenderer, draw_gesture_text
+
+FRAMES = 500
+FRAME_SHAPE = (480, 640, 3)
+
+def to_protobuf(hand):
+    """MediaPipe's drawing_utils needs real NormalizedLandmarkList messages"""
+    from mediapipe.framework.formats import landmark_pb2
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=p.x, y=p.y, z=p.z) for p in hand.landmark])
+
+def cpu_us_per_frame(draw, frame, hand):
+    for _ in range(20):
+        draw(frame, hand)
+    start = time.process_time()
+    for _ in range(FRAMES):
+        draw(frame, hand)
+    return (time.process_time() - start) / FRAMES * 1e6
+
+def main():
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    hand = synthetic_hands(1)[0]
+
+    def overlay(renderer):
+        def draw(frame, hand):
+            renderer.draw_hand(frame, hand)
+            draw_gesture_text(frame, 0, "Open_Palm")
+        return draw
+
+    cases = [('headless (no drawing)', lambda frame, hand: None, hand)]
+    try:
+        cases.append(('mediapipe drawing_utils', overlay(MediaPipeRenderer()), to_protobuf(hand)))
+    except ImportError:
+        print("mediapipe is not installed, skipping its renderer.")
+    cases.append(('fast polylines', overlay(FastRenderer()), hand))
+
+    results = [(name, cpu_us_per_frame(draw, frame, landmarks)) for name, draw, landmarks in cases]
+    baseline = dict(results).get('mediapipe drawing_utils')
+    print(f"{'overlay':<26}{'CPU us/frame':>14}{'saved vs mediapipe':>20}")
+    for name, cpu in results:
+        saved = f"{baseline - cpu:.1f}" if baseline is not None else 'n/a'
+        print(f"{name:<26}{cpu:>14.1f}{saved:>20}")
+    print("Headless mode also skips cv2.imshow and the window calls, which need a display to measure.")
+
+if __name__ == "__main__":
+    main()
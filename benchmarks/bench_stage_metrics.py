@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from stage_metrics import STAGES, StageMetrics, to_prometheus
+
+FRAMES = 100000
+FRAME_TIME = 1 / 30
+EXPORT_INTERVAL = 5.0
+
+def main():
+    metrics = StageMetrics()
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for stage in STAGES:
+            started = time.perf_counter()
+            metrics.since(stage, started)
+    per_frame = (time.perf_counter() - start) / FRAMES
+
+    start = time.perf_counter()
+    summary = metrics.summary()
+    to_prometheus(summary)
+    export = time.perf_counter() - start
+
+    print(f"{len(STAGES)} stages timed per frame: {per_frame * 1e6:.2f} us "
+          f"({per_frame / FRAME_TIME * 100:.3f}% of a 30 fps frame)")
+    print(f"Summary + Prometheus text every {EXPORT_INTERVAL:.0f} s: {export * 1000:.2f} ms "
+          f"({export / EXPORT_INTERVAL * 100:.3f}% of the interval)")
+
+if __name__ == "__main__":
+    main()
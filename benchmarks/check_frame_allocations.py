@@ -0,0 +1,65 @@
+import sys
+import tracemalloc
+import numpy as np
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+import cv2
+from frame_sources import FramePreprocessor
+from process_stats import rss_mb
+
+WARMUP_FRAMES = 10
+FRAMES = 300
+FRAME_SHAPE = (480, 640, 3)
+# Anything below a tenth of a frame per frame counts as "no full-frame allocation"
+MAX_BYTES_PER_FRAME = FRAME_SHAPE[0] * FRAME_SHAPE[1] * FRAME_SHAPE[2] // 10
+
+def allocating_preprocess(frame):
+    """What the control loop did before FramePreprocessor"""
+    frame = cv2.flip(frame, 1)
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return frame, rgb_frame
+
+def measure(preprocess, frames):
+    """Peak traced bytes allocated per frame, and RSS growth over the run"""
+    for frame in frames[:WARMUP_FRAMES]:
+        preprocess(frame)
+    rss_start = rss_mb()
+    tracemalloc.start()
+    peaks = []
+    for i in range(FRAMES):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        preprocess(frames[i % len(frames)])
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_end = rss_mb()
+    rss_growth = rss_end - rss_start if rss_start is not None and rss_end is not None else None
+    return np.array(peaks), current, rss_growth
+
+def main():
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, size=FRAME_SHAPE, dtype=np.uint8) for _ in range(4)]
+    preprocessor = FramePreprocessor()
+
+    def pooled_preprocess(frame):
+        # Like the control loop, give the mirrored frame back once it has been shown
+        mirrored, _ = preprocessor.process(frame)
+        preprocessor.pool.release(mirrored)
+
+    print(f"{'preprocess':<22}{'median B/frame':>16}{'max B/frame':>14}{'retained B':>12}{'RSS growth MB':>15}")
+    results = {}
+    for name, preprocess in (('flip + cvtColor', allocating_preprocess),
+                             ('FramePreprocessor', pooled_preprocess)):
+        peaks, retained, rss_growth = measure(preprocess, frames)
+        results[name] = peaks
+        growth = f"{rss_growth:.1f}" if rss_growth is not None else 'n/a'
+        print(f"{name:<22}{int(np.median(peaks)):>16}{int(peaks.max()):>14}{retained:>12}{growth:>15}")
+    if results['FramePreprocessor'].max() > MAX_BYTES_PER_FRAME:
+        print("FAILED: FramePreprocessor allocates full-frame arrays after warm-up.")
+        return 1
+    print("OK: allocations per frame stay flat after warm-up.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
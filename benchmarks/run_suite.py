@@ -0,0 +1,325 @@
+"""Benchmark suite for the recognition hot path, compared against a stored baseline.
+
+    python benchmarks/run_suite.py                       # run, print and write results.json
+    python benchmarks/run_suite.py --check               # exit 1 if a metric regressed
+    python benchmarks/run_suite.py --update-baseline     # store the results as the new baseline
+    python benchmarks/run_suite.py --csv gesture_data_auto_record.csv
+
+Runs headless: landmarks are synthetic, or rows of a training CSV with
+--csv, and the classifier uses random weights with the architecture of
+train_model.py, so no camera, MediaPipe or trained model is needed. Every
+metric is microseconds per call (lower is better). A case whose
+dependencies are missing is skipped and left out of the comparison.
+
+Each timing runs the call in batches of at least MIN_BATCH_SECONDS, so
+even sub-microsecond calls are measured well above timer noise, and every
+metric is the median over the rounds of the suite. It is compared after
+dividing by a fixed pure-Python calibration loop timed right before each
+case ("relative"), so a slower or busier machine does not show up as a
+regression; only code that got slower relative to it does.
+
+The suite also checks that the quantized classifiers agree with the
+float one on fixed-seed rows, with a scaler as skewed as the real one
+folded in; disagreement fails --check whatever the baseline says.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results.json')
+# A metric regresses when it is this much slower than the baseline (run-to-run spread is about 30%)
+TOLERANCE = 0.5
+# Per-metric overrides of TOLERANCE
+TOLERANCES = {}
+REPEATS = 7
+MIN_BATCH_SECONDS = 0.02
+# Quantized backends must agree with 'float' on this share of AGREEMENT_ROWS (random weights give
+# flatter outputs than a trained model, so a little below quantization_report.py's threshold)
+MIN_AGREEMENT = 0.98
+AGREEMENT_ROWS = 2000
+# Scale of the wrist's z in the shipped scaler: MediaPipe reports it as almost exactly 0
+WRIST_Z_SCALE = 3.7e-7
+# Layer sizes of the model built by train_model.py (7 gestures + the unused class 0)
+MODEL_SHAPE = (63, 128, 64, 8)
+CSV_ROWS = 5000
+# The suite runs this many times and each metric keeps its median; more for a new baseline
+ROUNDS = 3
+BASELINE_ROUNDS = 7
+
+def time_call(call):
+    """Best of REPEATS batches of at least MIN_BATCH_SECONDS each, in microseconds per call"""
+    timer = timeit.Timer(call)
+    number = 1
+    while timer.timeit(number) < MIN_BATCH_SECONDS:
+        number *= 2
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number * 1e6
+
+def calibration():
+    """Time of a fixed pure-Python workload (us), the yardstick for the machine's speed"""
+    def workload():
+        total = 0
+        for i in range(1000):
+            total += i * i % 7
+        return total
+    return time_call(workload)
+
+# region inputs
+def load_rows(csv_path, count=256):
+    """Landmark rows (n, 63) from a training CSV, or synthetic ones"""
+    import numpy as np
+    if csv_path:
+        with open(csv_path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)
+            rows = [row[:-1] for _, row in zip(range(count), reader)]
+        return np.asarray(rows, dtype=np.float32)
+    rng = np.random.default_rng(0)
+    rows = rng.uniform(0.2, 0.8, size=(count, MODEL_SHAPE[0])).astype(np.float32)
+    rows[:, 2::3] = rng.normal(0.0, 0.05, size=(count, MODEL_SHAPE[0] // 3))
+    return rows
+
+def synthetic_layers():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    activations = ['relu'] * (len(MODEL_SHAPE) - 2) + ['softmax']
+    return [(rng.normal(0, 0.1, size=(n_in, n_out)).astype(np.float32), np.zeros(n_out, dtype=np.float32), act)
+            for n_in, n_out, act in zip(MODEL_SHAPE, MODEL_SHAPE[1:], activations)]
+
+def synthetic_scaler():
+    """(mean, scale) shaped like the shipped StandardScaler, including the nearly constant wrist z"""
+    import numpy as np
+    rng = np.random.default_rng(1)
+    mean = rng.uniform(0.2, 0.8, size=MODEL_SHAPE[0])
+    mean[2::3] = rng.normal(0.0, 0.05, size=MODEL_SHAPE[0] // 3)
+    mean[2] = 0.0
+    scale = rng.uniform(0.05, 0.2, size=MODEL_SHAPE[0])
+    scale[2] = WRIST_Z_SCALE
+    return mean, scale
+
+def synthetic_model_layers():
+    """synthetic_layers with synthetic_scaler folded in, like the layers the control loop loads"""
+    from gesture_inference import fold_scaler
+    return fold_scaler(synthetic_layers(), *synthetic_scaler())
+# endregion
+
+# region cases
+def bench_landmark_extraction(rows):
+    from landmark_utils import LandmarkBuffer
+    from synthetic import hand_from_row
+    hands = [hand_from_row(row) for row in rows[:2]]
+    buffer = LandmarkBuffer(max_hands=2)
+    return {
+        'landmark_extraction_1_hand': time_call(lambda: buffer.fill(hands[:1])),
+        'landmark_extraction_2_hands': time_call(lambda: buffer.fill(hands)),
+    }
+
+def bench_scaler_transform(rows):
+    import numpy as np
+    mean, scale = rows.mean(axis=0), rows.std(axis=0) + 1e-6
+    row = rows[:1]
+    results = {'scaler_transform_numpy': time_call(lambda: (row - mean) / scale)}
+    try:
+        from sklearn.preprocessing import StandardScaler
+    except ImportError:
+        return results
+    scaler = StandardScaler().fit(rows)
+    results['scaler_transform_sklearn'] = time_call(lambda: scaler.transform(row))
+    return results
+
+def bench_predict_gesture(rows):
+    # The control module reads config.json from the working directory on import
+    os.chdir(ROOT_DIR)
+    import systerm_control_by_handgesture as control
+    from gesture_inference import build_model
+    from synthetic import hand_from_row
+    layers = synthetic_model_layers()
+    hand = hand_from_row(rows[0])
+    control.metrics = None
+    control.motion_gate = None
+    control.prediction_cache = None
+    results = {}
+    for backend in ('float', 'int8'):
+        control.model = build_model(layers, backend)
+        results[f'predict_gesture_{backend}'] = time_call(lambda: control.predict_gesture(hand))
+    return results
+
+def bench_gesture_sequences(rows):
+    import random
+    from sequence_engine import compile_sequences
+    with open(os.path.join(ROOT_DIR, 'config.json'), 'r') as f:
+        config = json.load(f)
+    results = {}
+    for mode in ('VIDEO', 'SLIDE'):
+        gestures = {int(k): v for k, v in config[mode].items()}
+        automaton = compile_sequences(config['SEQUENCES'][mode], gestures)
+        rng = random.Random(0)
+        stream = [rng.choice(list(gestures)) for _ in range(10000)]
+
+        def run():
+            automaton.reset()
+            for now, gesture in enumerate(stream):
+                automaton.check_timeout(now)
+                automaton.advance(gesture, now)
+        results[f'gesture_sequences_{mode.lower()}'] = time_call(run) / len(stream)
+    return results
+
+def bench_csv_ingestion(rows):
+    """pd.read_csv and the X/y split of train_model.py, per 1000 rows"""
+    import numpy as np
+    import pandas as pd
+    header = [f'{axis}{i}' for i in range(MODEL_SHAPE[0] // 3) for axis in 'xyz'] + ['label']
+    repeated = np.resize(rows, (CSV_ROWS, rows.shape[1]))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'gestures.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for i, row in enumerate(repeated):
+                writer.writerow([*row.tolist(), i % 7 + 1])
+
+        def ingest():
+            df = pd.read_csv(path)
+            return df.iloc[:, :-1].values, df.iloc[:, -1].values
+        return {'csv_ingestion_per_1000_rows': time_call(ingest) * 1000 / CSV_ROWS}
+
+def quantized_agreement():
+    """Share of fixed-seed rows on which each quantized backend predicts the same class as 'float'"""
+    import numpy as np
+    from gesture_inference import BACKENDS, build_model
+    layers = synthetic_model_layers()
+    mean, scale = synthetic_scaler()
+    rows = mean + scale * np.random.default_rng(2).standard_normal((AGREEMENT_ROWS, MODEL_SHAPE[0]))
+    reference = np.argmax(build_model(layers, 'float').predict(rows), axis=1)
+    agreement = {}
+    for backend in BACKENDS:
+        if backend != 'float':
+            with np.errstate(all='ignore'):
+                predicted = np.argmax(build_model(layers, backend).predict(rows), axis=1)
+            agreement[backend] = round(float(np.mean(predicted == reference)), 4)
+    return agreement
+
+# (name, function, needs the landmark rows, i.e. numpy)
+CASES = (
+    ('landmark_extraction', bench_landmark_extraction, True),
+    ('scaler_transform', bench_scaler_transform, True),
+    ('predict_gesture', bench_predict_gesture, True),
+    ('gesture_sequences', bench_gesture_sequences, False),
+    ('csv_ingestion', bench_csv_ingestion, True),
+)
+# endregion
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+def run_suite(csv_path=None, rounds=ROUNDS):
+    metrics, relative, skipped = {}, {}, {}
+    try:
+        rows = load_rows(csv_path)
+        agreement = quantized_agreement()
+    except ImportError:
+        rows = None
+        agreement = {}
+    for _ in range(rounds):
+        for name, bench, needs_rows in CASES:
+            if needs_rows and rows is None:
+                skipped[name] = "missing dependency: numpy"
+                continue
+            calibration_us = calibration()
+            try:
+                results = bench(rows)
+            except ImportError as e:
+                skipped[name] = f"missing dependency: {e.name}"
+                continue
+            for metric, value in results.items():
+                metrics.setdefault(metric, []).append(value)
+                relative.setdefault(metric, []).append(value / calibration_us)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'landmarks': csv_path or 'synthetic',
+        'rounds': rounds,
+        'unit': 'us/call',
+        'metrics': {name: round(median(values), 4) for name, values in metrics.items()},
+        'relative': {name: round(median(values), 6) for name, values in relative.items()},
+        'agreement': agreement,
+        'skipped': skipped,
+    }
+
+def compare(results, baseline, tolerance):
+    """Print every metric against the baseline and the agreement check; returns the names of the failed ones"""
+    regressed = []
+    print(f"{'metric':<34}{'us/call':>12}{'expected':>12}{'limit':>12}{'change':>10}")
+    for name, value in results['metrics'].items():
+        base = baseline.get('relative', {}).get(name)
+        if base is None:
+            print(f"{name:<34}{value:>12.3f}{'-':>12}{'-':>12}{'new':>10}")
+            continue
+        # The baseline in microseconds on this machine, from this run's calibration loop
+        expected = base * value / results['relative'][name]
+        limit = expected * (1 + TOLERANCES.get(name, tolerance))
+        change = value / expected - 1
+        flag = '  REGRESSED' if value > limit else ''
+        print(f"{name:<34}{value:>12.3f}{expected:>12.3f}{limit:>12.3f}{change * 100:>9.1f}%{flag}")
+        if value > limit:
+            regressed.append(name)
+    for backend, agreement in results.get('agreement', {}).items():
+        name = f'agreement_{backend}'
+        flag = '  FAILED' if agreement < MIN_AGREEMENT else ''
+        print(f"{name:<34}{agreement:>12.4f}{MIN_AGREEMENT:>12.4f}{'(minimum)':>22}{flag}")
+        if agreement < MIN_AGREEMENT:
+            regressed.append(name)
+    for name, reason in results['skipped'].items():
+        print(f"{name:<34}skipped ({reason})")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recognition hot path against a stored baseline.")
+    parser.add_argument('--csv', help="take landmarks from a training CSV instead of synthetic ones")
+    parser.add_argument('--rounds', type=int, help=f"runs of the suite; each metric keeps its median "
+                        f"(default {ROUNDS}, {BASELINE_ROUNDS} with --update-baseline)")
+    parser.add_argument('--output', default=RESULTS_PATH, help="where to write the results (JSON)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed slowdown before a metric counts as regressed (0.5 = 50%%)")
+    parser.add_argument('--check', action='store_true', help="exit with status 1 if a metric regressed")
+    parser.add_argument('--update-baseline', action='store_true', help="write the results to the baseline file")
+    args = parser.parse_args()
+
+    rounds = args.rounds or (BASELINE_ROUNDS if args.update_baseline else ROUNDS)
+    results = run_suite(args.csv, rounds)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline written to '{args.baseline}'.")
+        return
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+        print(f"No baseline at '{args.baseline}'; run with --update-baseline to create one.")
+    regressed = compare(results, baseline, args.tolerance)
+    if regressed:
+        print(f"{len(regressed)} metric(s) failed: {', '.join(regressed)}")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
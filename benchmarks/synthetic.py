@@ -0,0 +1,26 @@
+import os
+import sys
+from types import SimpleNamespace
+import numpy as np
+
+# Make the top-level modules importable when running `python benchmarks/<script>.py`
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from landmark_utils import NUM_LANDMARKS
+
+def hand_from_row(row):
+    """An object shaped like MediaPipe's NormalizedLandmarkList from 63 values (x0, y0, z0, x1, ...)"""
+    points = np.asarray(row, dtype=np.float64).reshape(NUM_LANDMARKS, 3)
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+
+def synthetic_hand(rng):
+    """A random hand: 21 points with x, y in [0.2, 0.8] and small z"""
+    points = rng.uniform(0.2, 0.8, size=(NUM_LANDMARKS, 3))
+    points[:, 2] = rng.normal(0.0, 0.05, size=NUM_LANDMARKS)
+    return hand_from_row(points.reshape(-1))
+
+def synthetic_hands(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [synthetic_hand(rng) for _ in range(count)]
@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import joblib
+from gesture_inference import DenseGestureModel, FUSED_MODEL_PATH, MODEL_PATH, SCALER_PATH, export_fused_from_h5
+
+# --- config ---
+CSV_FILE_NAME = 'gesture_data_auto_record.csv'
+NUM_SAMPLES = 500
+LATENCY_CALLS = 1000
+PROB_TOLERANCE = 1e-4
+
+def load_rows():
+    """Landmark rows from the training CSV, or synthetic rows if it does not exist"""
+    if os.path.exists(CSV_FILE_NAME):
+        import pandas as pd
+        rows = pd.read_csv(CSV_FILE_NAME).iloc[:NUM_SAMPLES, :-1].values
+        return rows.astype(np.float64), CSV_FILE_NAME
+    rng = np.random.default_rng(0)
+    rows = rng.uniform(0.0, 1.0, size=(NUM_SAMPLES, 63))
+    rows[:, 2::3] = rng.normal(0.0, 0.05, size=(NUM_SAMPLES, 21))
+    return rows, 'synthetic landmarks'
+
+def load_reference():
+    """The original runtime pair: Keras .h5 + pickled scaler (NumPy forward pass if TF is missing)"""
+    start = time.perf_counter()
+    try:
+        import tensorflow as tf
+        model = tf.keras.models.load_model(MODEL_PATH)
+        predict = lambda x: model.predict(x, verbose=0)
+        name = 'keras .h5 + scaler.pkl'
+    except ImportError:
+        model = DenseGestureModel.from_h5(MODEL_PATH)
+        predict = model.predict
+        name = 'numpy .h5 + scaler.pkl'
+    scaler = joblib.load(SCALER_PATH)
+    load_ms = (time.perf_counter() - start) * 1000
+    return name, load_ms, lambda rows: predict(scaler.transform(rows))
+
+def load_fused():
+    start = time.perf_counter()
+    model = DenseGestureModel.from_npz(FUSED_MODEL_PATH)
+    load_ms = (time.perf_counter() - start) * 1000
+    return f'fused {FUSED_MODEL_PATH}', load_ms, model.predict
+
+def per_call_latency_us(predict, row):
+    """Median latency of a single-row call, the way the control loop calls it"""
+    for _ in range(20):
+        predict(row)
+    timings = np.empty(LATENCY_CALLS)
+    for i in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        predict(row)
+        timings[i] = time.perf_counter() - start
+    return np.median(timings) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the fused model against the .h5 + .pkl pair.")
+    parser.add_argument('--export', action='store_true',
+                        help=f"first build '{FUSED_MODEL_PATH}' from the existing .h5 + .pkl pair")
+    args = parser.parse_args()
+
+    for path in (MODEL_PATH, SCALER_PATH):
+        if not os.path.exists(path):
+            print(f"Error: '{path}' not found. Run 'train_model.py' first.")
+            return 1
+    if args.export:
+        export_fused_from_h5(MODEL_PATH, SCALER_PATH, FUSED_MODEL_PATH)
+        print(f"Fused model exported to '{FUSED_MODEL_PATH}'.")
+    elif not os.path.exists(FUSED_MODEL_PATH):
+        print(f"Error: '{FUSED_MODEL_PATH}' not found. Run 'python check_fused_model.py --export' to build it "
+              f"from '{MODEL_PATH}' and '{SCALER_PATH}'.")
+        return 1
+
+    rows, source = load_rows()
+    reference = load_reference()
+    fused = load_fused()
+
+    ref_prob = np.asarray(reference[2](rows))
+    fused_prob = np.asarray(fused[2](rows))
+    max_diff = np.abs(ref_prob - fused_prob).max()
+    agreement = np.mean(np.argmax(ref_prob, axis=1) == np.argmax(fused_prob, axis=1))
+
+    print(f"Compared {len(rows)} rows from {source}")
+    print(f"max |p_ref - p_fused| = {max_diff:.2e}, argmax agreement = {agreement:.4f}")
+    print(f"{'backend':<32}{'load (ms)':>12}{'per call (us)':>16}")
+    for name, load_ms, predict in (reference, fused):
+        latency = per_call_latency_us(predict, rows[:1])
+        print(f"{name:<32}{load_ms:>12.2f}{latency:>16.1f}")
+
+    if agreement < 1.0 or max_diff > PROB_TOLERANCE:
+        print("FAILED: fused model does not match the .h5 + .pkl pair.")
+        return 1
+    print("OK: fused model matches the .h5 + .pkl pair.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
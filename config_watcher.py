@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class WatchedFile:
+    """Latest parsed contents of a watched file.
+
+    `version` goes up each time the file changed and was parsed again;
+    readers compare it with the version they last applied, which costs no
+    file access. `value` is None until the file has been parsed once.
+    """
+
+    def __init__(self, path, parse):
+        self.path = path
+        self.parse = parse
+        self.value = None
+        self.version = 0
+        self._signature = None
+
+class ConfigWatcher:
+    """Watch config files from a background thread and parse them only when they change.
+
+    Every `interval` seconds each file is `os.stat`-ed; when its mtime or
+    size differs from the last successful parse, it is parsed again. A file
+    that fails to parse (e.g. caught mid-write) keeps its previous value and
+    is retried on the next check.
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.files = []
+        self.stat_calls = 0
+        self.parses = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, path, parse=load_json):
+        """Start watching `path`; it is parsed right away"""
+        watched = WatchedFile(path, parse)
+        self.files.append(watched)
+        self._check(watched)
+        return watched
+
+    def _check(self, watched):
+        self.stat_calls += 1
+        try:
+            st = os.stat(watched.path)
+        except OSError:
+            return
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == watched._signature:
+            return
+        self.parses += 1
+        try:
+            value = watched.parse(watched.path)
+        except Exception:
+            return
+        watched.value = value
+        watched._signature = signature
+        watched.version += 1
+
+    def check(self):
+        """Check every file once"""
+        for watched in self.files:
+            self._check(watched)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ConfigWatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
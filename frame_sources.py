@@ -0,0 +1,321 @@
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from types import SimpleNamespace
+from landmark_utils import NUM_LANDMARKS
+
+class FramePool:
+    """Free list of frame arrays, shared by the camera reader and the preprocessor.
+
+    `acquire` hands out a free array of the requested shape, or a new one
+    when none is free, and `release` gives it back once its holder is done
+    with it. An array is never handed out again before it is released, so a
+    frame waiting in a queue or being drawn cannot be overwritten; one that
+    is never released (e.g. dropped by a queue) is garbage collected.
+    Thread-safe.
+    """
+
+    def __init__(self, max_free=8):
+        self.max_free = max_free
+        self.allocated = 0
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        with self._lock:
+            while self._free:
+                array = self._free.pop()
+                # Arrays of another size (before a resolution change) are discarded
+                if array.shape == shape and array.dtype == dtype:
+                    return array
+            self.allocated += 1
+        return np.empty(shape, dtype)
+
+    def release(self, array):
+        """Make an array reusable; its holder must not touch it afterwards"""
+        with self._lock:
+            if len(self._free) < self.max_free:
+                self._free.append(array)
+
+    def read(self, capture, shape):
+        """`capture.read()` into an array of the pool; `shape` is that of the previous frame (None at first)"""
+        if shape is None:
+            return capture.read()
+        target = self.acquire(shape)
+        ret, frame = capture.read(target)
+        if not ret or frame is not target:
+            # Failed, or OpenCV returned a new array because the frame size changed
+            self.release(target)
+        return ret, frame
+
+class LatestFrameGrabber:
+    """Read a camera on a background thread and hand out only the newest frame.
+
+    Drop-in replacement for `cv2.VideoCapture` in the control loops: `read`
+    returns `(ret, frame)` and waits only until a frame newer than the last
+    one returned is available. A slow camera only makes it wait longer; `ret`
+    is False only once the camera failed or the grabber was released. Frames
+    that arrive while the consumer is busy are replaced by newer ones and
+    counted in `dropped`.
+
+    With `decode_interval` set (seconds), frames are only decoded that often;
+    the ones in between are grabbed from the camera but not decoded.
+
+    With a FramePool, frames are decoded into arrays of the pool instead of
+    a new array per frame. A frame returned by `read` belongs to the caller,
+    who gives it back with `pool.release`; a frame replaced before it was
+    returned goes back to the pool right away.
+    """
+
+    def __init__(self, source=0, capture=None, pool=None):
+        self.cap = capture if capture is not None else cv2.VideoCapture(source)
+        self.pool = pool
+        self._shape = None
+        self.frames_read = 0
+        self.dropped = 0
+        self.decode_interval = 0.0
+        self._next_decode = 0.0
+        self._frame = None
+        self._sequence = 0
+        self._returned_sequence = 0
+        self._failed = False
+        self._running = True
+        # Calls for the reader thread, run between two reads (VideoCapture is not thread-safe)
+        self._pending = []
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='LatestFrameGrabber', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            if self._pending:
+                with self._condition:
+                    pending, self._pending = self._pending, []
+                for call in pending:
+                    call(self.cap)
+            if self.decode_interval:
+                if time.monotonic() < self._next_decode:
+                    # Keep the camera's buffer drained without paying for the decode
+                    if self.cap.grab():
+                        continue
+                    ret, frame = False, None
+                else:
+                    self._next_decode = time.monotonic() + self.decode_interval
+                    ret, frame = self._read_into_pool()
+            else:
+                ret, frame = self._read_into_pool()
+            with self._condition:
+                if not ret:
+                    self._failed = True
+                    self._condition.notify_all()
+                    return
+                if self._sequence != self._returned_sequence:
+                    # The previous frame was never handed out
+                    self.dropped += 1
+                    if self.pool is not None:
+                        self.pool.release(self._frame)
+                self._frame = frame
+                self._sequence += 1
+                self.frames_read += 1
+                self._condition.notify_all()
+
+    def _read_into_pool(self):
+        if self.pool is None:
+            return self.cap.read()
+        ret, frame = self.pool.read(self.cap, self._shape)
+        if ret:
+            self._shape = frame.shape
+        return ret, frame
+
+    def read(self):
+        """Return (True, newest frame), or (False, None) once the camera failed or was released"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._sequence != self._returned_sequence or self._failed or not self._running)
+            if self._sequence == self._returned_sequence:
+                return False, None
+            self._returned_sequence = self._sequence
+            return True, self._frame
+
+    def isOpened(self):
+        return self.cap.isOpened() and not self._failed
+
+    def call_between_reads(self, call):
+        """Run `call(capture)` on the reader thread before its next read"""
+        with self._condition:
+            self._pending.append(call)
+
+    def get(self, prop_id, timeout=2.0):
+        """Read a property on the reader thread; waits for the current read to finish"""
+        done = threading.Event()
+        result = []
+        self.call_between_reads(lambda cap: (result.append(cap.get(prop_id)), done.set()))
+        if not done.wait(timeout):
+            return 0.0
+        return result[0]
+
+    def set(self, prop_id, value):
+        """Applied by the reader thread before its next read; always returns True"""
+        self.call_between_reads(lambda cap: cap.set(prop_id, value))
+        return True
+
+    def release(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+
+class FramePreprocessor:
+    """Mirror a BGR frame and convert it to RGB into reused buffers.
+
+    Uses OpenCV's `dst=` outputs, so no full-frame array is allocated once
+    the frames are given back. The mirrored BGR frame is drawn on and shown
+    later (possibly while the next frames are processed), so it comes from
+    the FramePool and belongs to the caller until it is released there; the
+    RGB frame is only read by MediaPipe during the same call and uses a
+    single buffer.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else FramePool()
+        self._rgb = None
+
+    def process(self, frame):
+        """Return (mirrored BGR frame from the pool, RGB frame owned by the preprocessor)"""
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        bgr_frame = self.pool.acquire(frame.shape, frame.dtype)
+        cv2.flip(frame, 1, dst=bgr_frame)
+        cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return bgr_frame, self._rgb
+
+class ReplaySource:
+    """Base of the recorded inputs: frame timestamps and optional real-time pacing.
+
+    Subclasses implement `_next()`, returning (ret, item, timestamp in
+    seconds from the start of the recording). `timestamp` is the time of the
+    last item read, so the control loop can use recording time instead of
+    wall time and replays are deterministic. With `realtime`, `read` waits
+    until the item is due; otherwise items are delivered as fast as possible.
+    """
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.timestamp = 0.0
+        self.frames_read = 0
+        self._started = None
+
+    def read(self, frame=None):
+        ret, item, timestamp = self._next(frame)
+        if not ret:
+            return False, None
+        if self.realtime:
+            if self._started is None:
+                self._started = time.perf_counter() - timestamp
+            delay = self._started + timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.timestamp = timestamp
+        self.frames_read += 1
+        return True, item
+
+    def clock(self):
+        return self.timestamp
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+class VideoFileSource(ReplaySource):
+    """Frames of a recorded video file (e.g. from recorded_gestures/)"""
+
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime)
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def _next(self, frame):
+        ret, frame = self.cap.read(frame)
+        # Frame index / fps: some containers report no position
+        return ret, frame, self.frames_read / self.fps
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class ImageDirSource(ReplaySource):
+    """Image files of a directory in name order, played at `fps`"""
+
+    def __init__(self, directory, fps=30.0, realtime=False):
+        super().__init__(realtime)
+        self.fps = fps
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+
+    def _next(self, frame):
+        while self.frames_read < len(self.paths):
+            image = cv2.imread(self.paths[self.frames_read])
+            if image is not None:
+                return True, image, self.frames_read / self.fps
+            print(f"Skipping unreadable image '{self.paths[self.frames_read]}'.")
+            del self.paths[self.frames_read]
+        return False, None, None
+
+class LandmarkLogSource(ReplaySource):
+    """Hand landmarks recorded by LandmarkLogWriter, one frame per JSON line.
+
+    Each item is the frame's list of hands, shaped like MediaPipe's
+    `multi_hand_landmarks` (empty when no hand was tracked), so replays skip
+    the camera and MediaPipe entirely.
+    """
+
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime)
+        self.path = path
+        self._file = open(path, 'r', encoding='utf-8')
+
+    def _next(self, frame):
+        for line in self._file:
+            if line.strip():
+                record = json.loads(line)
+                hands = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in
+                                                   zip(row[0::3], row[1::3], row[2::3])])
+                         for row in record['hands']]
+                return True, hands, record['t']
+        return False, None, None
+
+    def release(self):
+        self._file.close()
+
+class LandmarkLogWriter:
+    """Write each frame's hand landmarks as a JSON line: {"t": seconds, "hands": [[x0, y0, z0, ...], ...]}"""
+
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, timestamp, multi_hand_landmarks):
+        hands = [[round(v, 6) for landmark in hand.landmark[:NUM_LANDMARKS]
+                  for v in (landmark.x, landmark.y, landmark.z)]
+                 for hand in multi_hand_landmarks or []]
+        self._file.write(json.dumps({'t': round(timestamp, 6), 'hands': hands}) + '\n')
+
+    def close(self):
+        self._file.close()
+
+def open_camera(source=0, threaded=True, pool=None):
+    """Open the camera, optionally behind a LatestFrameGrabber"""
+    if threaded:
+        return LatestFrameGrabber(source, pool=pool)
+    return cv2.VideoCapture(source)
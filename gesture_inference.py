@@ -0,0 +1,325 @@
+import io
+import json
+import mmap
+import os
+import struct
+import zipfile
+import numpy as np
+
+MODEL_PATH = 'gesture_recognition_model.h5'
+SCALER_PATH = 'scaler.pkl'
+FUSED_MODEL_PATH = 'gesture_model.npz'
+FUSED_FORMAT_VERSION = 1
+
+# region activations
+def _relu(x):
+    np.maximum(x, 0, out=x)
+    return x
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+def _linear(x):
+    return x
+
+ACTIVATIONS = {
+    'relu': _relu,
+    'softmax': _softmax,
+    'linear': _linear,
+}
+# endregion
+
+# region read Keras .h5 weights
+def _as_str(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return str(value)
+
+def _iter_layer_configs(model_config):
+    """Yield the layer configs of a saved Sequential model (old and new Keras layouts)"""
+    layers = model_config.get('config', [])
+    if isinstance(layers, dict):
+        layers = layers.get('layers', [])
+    for layer in layers:
+        yield layer
+
+def _activation_name(activation):
+    if isinstance(activation, dict):
+        return activation.get('config', {}).get('name', activation.get('class_name', 'linear')).lower()
+    return str(activation or 'linear').lower()
+
+def _read_dense_weights(group):
+    """Return (kernel, bias) stored in a Dense layer group of a Keras .h5 file"""
+    weight_names = [_as_str(n) for n in group.attrs.get('weight_names', [])]
+    if len(weight_names) < 2:
+        # Fall back to searching the group for the kernel/bias datasets
+        found = []
+        group.visititems(lambda name, obj: found.append(name) if hasattr(obj, 'shape') else None)
+        weight_names = sorted(found, key=lambda name: 'bias' in name.rsplit('/', 1)[-1])
+    kernel = np.asarray(group[weight_names[0]][()], dtype=np.float32)
+    bias = np.asarray(group[weight_names[1]][()], dtype=np.float32)
+    return kernel, bias
+
+def load_dense_layers(model_path=MODEL_PATH):
+    """Read the Dense layers of a Keras .h5 model as a list of (kernel, bias, activation)"""
+    import h5py
+
+    layers = []
+    with h5py.File(model_path, 'r') as f:
+        model_config = json.loads(_as_str(f.attrs['model_config']))
+        weights_root = f['model_weights'] if 'model_weights' in f else f
+        for layer in _iter_layer_configs(model_config):
+            if layer.get('class_name') != 'Dense':
+                # Dropout and InputLayer do nothing at inference time
+                continue
+            name = layer['config']['name']
+            kernel, bias = _read_dense_weights(weights_root[name])
+            activation = _activation_name(layer['config'].get('activation'))
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{activation}' in layer '{name}'.")
+            layers.append((kernel, bias, activation))
+    if not layers:
+        raise ValueError(f"No Dense layers found in '{model_path}'.")
+    return layers
+
+def dense_layers_from_keras(model):
+    """Read the Dense layers of an in-memory Keras model (used right after training)"""
+    layers = []
+    for layer in model.layers:
+        if layer.__class__.__name__ != 'Dense':
+            continue
+        kernel, bias = layer.get_weights()
+        layers.append((kernel, bias, layer.activation.__name__))
+    return layers
+# endregion
+
+# region fused artifact (scaler folded into the first Dense layer)
+def fold_scaler(layers, mean, scale):
+    """Fold StandardScaler ((x - mean) / scale) into the first Dense layer.
+
+    ((x - mean) / scale) @ W + b == x @ (W / scale[:, None]) + (b - (mean / scale) @ W)
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+    kernel, bias, activation = layers[0]
+    kernel = np.asarray(kernel, dtype=np.float64)
+    fused_kernel = kernel / scale[:, None]
+    fused_bias = np.asarray(bias, dtype=np.float64) - (mean / scale) @ kernel
+    return [(fused_kernel.astype(np.float32), fused_bias.astype(np.float32), activation)] + list(layers[1:])
+
+def export_fused_model(layers, mean, scale, path=FUSED_MODEL_PATH):
+    """Write the scaler-folded weights to a single uncompressed, versioned .npz file"""
+    fused = fold_scaler(layers, mean, scale)
+    arrays = {
+        'format_version': np.array([FUSED_FORMAT_VERSION], dtype=np.int32),
+        'activations': np.array([activation for _, _, activation in fused]),
+    }
+    for i, (kernel, bias, _) in enumerate(fused):
+        arrays[f'kernel_{i}'] = np.ascontiguousarray(kernel, dtype=np.float32)
+        arrays[f'bias_{i}'] = np.ascontiguousarray(bias, dtype=np.float32)
+    # np.savez (not savez_compressed) stores members uncompressed so they can be memory-mapped.
+    # Written next to the target and renamed, so a failed export never leaves a truncated file
+    # that looks newer than the .h5 file
+    temp_path = path + '.tmp.npz'
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+    return fused
+
+def export_fused_from_h5(model_path=MODEL_PATH, scaler_path=SCALER_PATH, path=FUSED_MODEL_PATH):
+    """Build the fused artifact from an existing .h5 + .pkl pair, without retraining"""
+    import joblib
+    scaler = joblib.load(scaler_path)
+    return export_fused_model(load_dense_layers(model_path), scaler.mean_, scaler.scale_, path)
+
+def _mmap_npz(path):
+    """Memory-map every member of an uncompressed .npz file without copying the data"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"'{path}' is compressed and cannot be memory-mapped.")
+            # Local file header: 30 fixed bytes, then the file name and extra field
+            name_len, extra_len = struct.unpack('<HH', buffer[info.header_offset + 26:info.header_offset + 30])
+            offset = info.header_offset + 30 + name_len + extra_len
+            header = io.BytesIO(buffer[offset:offset + min(info.file_size, 4096)])
+            version = np.lib.format.read_magic(header)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+            count = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset + header.tell())
+            arrays[info.filename[:-4]] = array.reshape(shape, order='F' if fortran_order else 'C')
+    return arrays
+
+def load_fused_layers(path=FUSED_MODEL_PATH, use_mmap=True):
+    """Read the layers of a fused .npz artifact, memory-mapped when possible"""
+    if use_mmap:
+        try:
+            arrays = _mmap_npz(path)
+        except (ValueError, OSError):
+            use_mmap = False
+    if not use_mmap:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+    version = int(arrays['format_version'][0])
+    if version != FUSED_FORMAT_VERSION:
+        raise ValueError(f"'{path}' has format version {version}, expected {FUSED_FORMAT_VERSION}.")
+    activations = [str(a) for a in arrays['activations']]
+    return [(arrays[f'kernel_{i}'], arrays[f'bias_{i}'], activation)
+            for i, activation in enumerate(activations)]
+# endregion
+
+class DenseGestureModel:
+    """NumPy forward pass of the gesture MLP (Dense -> ReLU ... -> softmax).
+
+    `predict` returns class probabilities like `tf.keras.Model.predict`, so
+    it can replace the Keras model without importing TensorFlow. When the
+    scaler is folded into the first layer (`from_h5` with a scaler, or
+    `from_npz`) it takes raw landmark rows instead of scaled ones.
+    """
+
+    def __init__(self, layers):
+        # np.asarray keeps memory-mapped float32 arrays as they are (no copy)
+        self.layers = [(np.asarray(kernel, dtype=np.float32),
+                        np.asarray(bias, dtype=np.float32),
+                        ACTIVATIONS[activation])
+                       for kernel, bias, activation in layers]
+        self.num_features = self.layers[0][0].shape[0]
+        self.num_classes = self.layers[-1][0].shape[1]
+
+    @classmethod
+    def from_h5(cls, model_path=MODEL_PATH, scaler_path=None):
+        layers = load_dense_layers(model_path)
+        if scaler_path is not None:
+            import joblib
+            scaler = joblib.load(scaler_path)
+            layers = fold_scaler(layers, scaler.mean_, scaler.scale_)
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path=FUSED_MODEL_PATH, use_mmap=True):
+        return cls(load_fused_layers(path, use_mmap=use_mmap))
+
+    def predict(self, rows, verbose=0):
+        """Return class probabilities with shape (n, num_classes)"""
+        x = np.asarray(rows, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = activation(x)
+        return x
+
+
+class QuantizedGestureModel:
+    """Reduced-precision variant of DenseGestureModel.
+
+    The first layer stays in float32: with the scaler folded in, its weights
+    are divided by the feature scales, and a nearly constant feature (the
+    wrist's z is always about 0) makes one input row millions of times larger
+    than the others, which float16 overflows and per-channel int8 rounds the
+    rest of to 0. The later layers are reduced:
+
+    'int8': weights are quantized symmetrically per output channel and the
+    input of every layer is quantized per row at run time; the integer
+    values are multiplied by float32 BLAS (NumPy has no fast integer matmul;
+    the sums stay below 2**24, so they are exact) and rescaled before the
+    bias and activation. In NumPy this is slower than 'float', so 'int8'
+    is for checking how the model holds up to quantization. 'float16': weights and
+    activations are rounded to float16 and accumulated in float32.
+    """
+
+    def __init__(self, layers, precision='int8'):
+        if precision not in ('int8', 'float16'):
+            raise ValueError(f"Unsupported precision '{precision}'.")
+        self.precision = precision
+        self.layers = []
+        for index, (kernel, bias, activation) in enumerate(layers):
+            kernel = np.asarray(kernel, dtype=np.float32)
+            bias = np.asarray(bias, dtype=np.float32)
+            if index == 0:
+                self.layers.append((kernel, None, bias, ACTIVATIONS[activation], None))
+            elif precision == 'int8':
+                w_scale = np.abs(kernel).max(axis=0) / 127.0
+                w_scale[w_scale == 0] = 1.0
+                # int8 values, kept as float32 so the matmul runs in BLAS
+                q_kernel = np.clip(np.rint(kernel / w_scale), -127, 127).astype(np.int8).astype(np.float32)
+                self.layers.append((q_kernel, w_scale.astype(np.float32), bias, ACTIVATIONS[activation], 'int8'))
+            else:
+                # float16-rounded weights, kept widened so the matmul runs in float32 BLAS
+                self.layers.append((kernel.astype(np.float16).astype(np.float32), None, bias,
+                                    ACTIVATIONS[activation], 'float16'))
+        self.num_features = self.layers[0][0].shape[0]
+        self.num_classes = self.layers[-1][0].shape[1]
+
+    def predict(self, rows, verbose=0):
+        """Return class probabilities with shape (n, num_classes)"""
+        x = np.asarray(rows, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        for kernel, w_scale, bias, activation, precision in self.layers:
+            if precision == 'int8':
+                a_scale = np.abs(x).max(axis=1, keepdims=True) / 127.0
+                a_scale[a_scale == 0] = 1.0
+                q_x = np.clip(np.rint(x / a_scale), -127, 127)
+                x = q_x @ kernel
+                x *= a_scale * w_scale
+            elif precision == 'float16':
+                x = x.astype(np.float16).astype(np.float32) @ kernel
+            else:
+                x = x @ kernel
+            x += bias
+            x = activation(x)
+        return x
+
+BACKENDS = ('float', 'int8', 'float16')
+
+def fused_model_is_current(fused_path=FUSED_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """True when the fused .npz artifact exists and is not older than the .h5 and .pkl files"""
+    if not os.path.exists(fused_path):
+        return False
+    fused_mtime = os.path.getmtime(fused_path)
+    return all(fused_mtime >= os.path.getmtime(path) for path in (model_path, scaler_path) if os.path.exists(path))
+
+def model_files_signature(fused_path=FUSED_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Modification times of the model files (None for a missing one); changes after retraining"""
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None
+                 for path in (fused_path, model_path, scaler_path))
+
+def load_layers(fused_path=FUSED_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Load the layers of the model that takes raw landmark rows.
+
+    Prefer the fused .npz artifact. When it is missing or older than the
+    .h5 + .pkl pair (an install from before it existed, or a retrain), it is
+    exported from the pair first; if that fails, the pair is used directly.
+    """
+    if fused_model_is_current(fused_path, model_path, scaler_path):
+        return load_fused_layers(fused_path), fused_path
+    try:
+        export_fused_from_h5(model_path, scaler_path, fused_path)
+        print(f"Exported '{fused_path}' from '{model_path}' + '{scaler_path}'.")
+        return load_fused_layers(fused_path), fused_path
+    except OSError as e:
+        print(f"Could not write '{fused_path}', loading '{model_path}' + '{scaler_path}' directly: {e}")
+    import joblib
+    scaler = joblib.load(scaler_path)
+    return fold_scaler(load_dense_layers(model_path), scaler.mean_, scaler.scale_), model_path
+
+def build_model(layers, backend='float'):
+    if backend == 'float':
+        return DenseGestureModel(layers)
+    if backend in BACKENDS:
+        return QuantizedGestureModel(layers, precision=backend)
+    raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}.")
+
+def load_gesture_model(fused_path=FUSED_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH, backend='float'):
+    """Load the classifier for the given backend; returns (model, loaded_from)"""
+    layers, loaded_from = load_layers(fused_path, model_path, scaler_path)
+    return build_model(layers, backend), loaded_from
@@ -9,7 +9,9 @@ import threading
 from pystray import Icon, Menu, MenuItem
 from PIL import Image, ImageTk
 
-from message import send_message_to_file 
+import message_bus
+from supervisor import Heartbeat
+from message import send_message
 
 MODE_CONFIG_FILE = 'mode_config.json'
 APP_ICON_PATH = 'five.png' 
@@ -29,6 +31,10 @@ def read_current_mode_from_file():
         return 'VIDEO'
 
 def write_current_mode_to_file(mode):
+    # Tell the control process right away; the file keeps the mode across restarts
+    endpoint = message_bus.current_endpoint()
+    if endpoint is not None:
+        endpoint.publish(message_bus.MODE, {'current_mode': mode.upper()})
     try:
         with open(MODE_CONFIG_FILE, 'w') as f:
             json.dump({'current_mode': mode.upper()}, f, indent=2)
@@ -147,6 +153,16 @@ class ModeSwitcherApp:
         self.create_tray_icon()
         # Hide window initially and only show system tray icon
         self.master.withdraw()
+
+        # Tell the supervisor in main.py that the Tk loop is alive
+        endpoint = message_bus.current_endpoint()
+        if endpoint is not None:
+            self.heartbeat = Heartbeat(endpoint, 'gui')
+            self.send_heartbeat()
+
+    def send_heartbeat(self):
+        self.heartbeat.beat()
+        self.master.after(1000, self.send_heartbeat)
         
     # --- Handle window move events ---
     def start_move_window(self, event):
@@ -200,7 +216,7 @@ class ModeSwitcherApp:
 
     # --- Hide window and only show system tray icon ---
     def minimize_to_tray(self):
-        send_message_to_file("Window minimized to system tray.")
+        send_message("Window minimized to system tray.")
         self.master.withdraw() # Hide window
 
     # --- Show window from system tray ---
@@ -208,11 +224,15 @@ class ModeSwitcherApp:
         self.master.deiconify()
         self.master.lift()
         self.master.focus_force()
-        send_message_to_file("Window restored from system tray.")
+        send_message("Window restored from system tray.")
 
     # --- Close the entire app from GUI close button or system tray ---
     def close_app(self):
-        set_status_false()  # Thêm dòng này để cập nhật
+        endpoint = message_bus.current_endpoint()
+        if endpoint is not None:
+            endpoint.publish(message_bus.SHUTDOWN)
+        else:
+            set_status_false()  # Thêm dòng này để cập nhật
         if self.tray_icon:
             self.tray_icon.stop() # Stop system tray icon
         self.master.quit() # Stop Tkinter main loop
@@ -234,13 +254,13 @@ class ModeSwitcherApp:
         current_mode_value = "SLIDE"
         self.current_mode_display.set(current_mode_value)
         write_current_mode_to_file(current_mode_value)
-        send_message_to_file("Slide mode activated.")
+        send_message("Slide mode activated.")
 
     def set_video_mode(self):
         current_mode_value = "VIDEO"
         self.current_mode_display.set(current_mode_value)
         write_current_mode_to_file(current_mode_value)
-        send_message_to_file("Video mode activated.")
+        send_message("Video mode activated.")
 
 # if __name__ == "__main__":
 #     initial_mode = read_current_mode_from_file()
@@ -250,7 +270,8 @@ class ModeSwitcherApp:
 #     app = ModeSwitcherApp(root)
 #     root.mainloop()
 
-def control_gui_mode():
+def control_gui_mode(bus=None):
+    message_bus.connect(bus, 'gui')
     initial_mode = read_current_mode_from_file()
     write_current_mode_to_file(initial_mode)
 
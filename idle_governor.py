@@ -0,0 +1,176 @@
+import time
+import cv2
+import numpy as np
+
+ACTIVE = 'active'
+IDLE = 'idle'
+
+# Size of the thumbnails compared to detect motion while idle
+MOTION_THUMBNAIL = (32, 24)
+# Requested camera size meaning "the size the camera had before going idle"
+FULL_SIZE = 'full'
+
+class IdleGovernor:
+    """Run hand detection less often while nobody is in front of the camera.
+
+    After `idle_after` seconds without a hand the governor goes idle: hand
+    detection only runs every `detect_interval` seconds, the control loop
+    only takes a frame every `frame_interval` seconds (see `pace`), and
+    with `resolution` ((width, height)) the camera is switched to that size.
+    With `wake_on_motion`, every idle frame is also compared with the
+    previous one on a 32x24 thumbnail; a change of more than
+    `motion_threshold` (mean absolute difference, 0-255) runs detection on
+    that frame, so a hand entering the view is picked up on the next frame
+    taken rather than at the next sample. The first frame with a hand
+    switches back to full rate (and resolution).
+
+    CPU time of the whole process (`time.process_time`) and wall time are
+    accounted per state; `summary()` reports them as CPU seconds per minute.
+    """
+
+    def __init__(self, idle_after=5.0, detect_interval=0.5, wake_on_motion=True,
+                 motion_threshold=6.0, resolution=None, frame_interval=0.1):
+        self.idle_after = idle_after
+        self.detect_interval = detect_interval
+        self.wake_on_motion = wake_on_motion
+        self.motion_threshold = motion_threshold
+        self.resolution = tuple(resolution) if resolution else None
+        self.frame_interval = frame_interval
+        self.state = ACTIVE
+        self.last_hand = None
+        self.next_detect = 0.0
+        self.next_frame = 0.0
+        self.wakeups = 0
+        self.skipped = 0
+        # Camera size to apply (see apply_resolution); the ones to restore and in use are only
+        # touched by the thread reading the camera
+        self._wanted_size = None
+        self._full_size = None
+        self._camera_size = None
+        self._thumbnails = [np.empty((MOTION_THUMBNAIL[1], MOTION_THUMBNAIL[0], 3), dtype=np.uint8)
+                            for _ in range(2)]
+        self._difference = np.empty_like(self._thumbnails[0])
+        self._has_thumbnail = False
+        self.cpu = {ACTIVE: 0.0, IDLE: 0.0}
+        self.wall = {ACTIVE: 0.0, IDLE: 0.0}
+        self._cpu_mark = time.process_time()
+        self._wall_mark = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config):
+        """Governor from the "idle" section of RUNTIME in config.json, or None when disabled"""
+        if not config.get('enabled', True):
+            return None
+        return cls(idle_after=float(config.get('after', 5.0)),
+                   detect_interval=float(config.get('detect_interval', 0.5)),
+                   wake_on_motion=bool(config.get('wake_on_motion', True)),
+                   motion_threshold=float(config.get('motion_threshold', 6.0)),
+                   resolution=config.get('resolution'),
+                   frame_interval=float(config.get('frame_interval', 0.1)))
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def should_detect(self, frame, now):
+        """False when this frame can skip hand detection"""
+        if self.state == ACTIVE:
+            return True
+        moved = self.wake_on_motion and self._moved(frame)
+        if moved or now >= self.next_detect:
+            self.next_detect = now + self.detect_interval
+            return True
+        self.skipped += 1
+        return False
+
+    def pace(self, capture, now):
+        """Seconds to wait before reading the next frame (0 while active).
+
+        While idle, frames are only taken every `frame_interval` seconds; a
+        LatestFrameGrabber also skips decoding the frames in between. `now`
+        is wall time (time.monotonic), also for replays.
+        """
+        interval = self.frame_interval if self.state == IDLE else 0.0
+        if hasattr(capture, 'decode_interval'):
+            capture.decode_interval = interval
+        if not interval:
+            return 0.0
+        delay = max(0.0, self.next_frame - now)
+        self.next_frame = now + delay + interval
+        return delay
+
+    def update(self, hand_present, now):
+        """Record the result of a detection; switches between active and idle"""
+        if hand_present:
+            self.last_hand = now
+            if self.state == IDLE:
+                self.wakeups += 1
+                self._switch(ACTIVE)
+                if self.resolution is not None:
+                    self._wanted_size = FULL_SIZE
+        elif self.last_hand is None:
+            self.last_hand = now
+        elif self.state == ACTIVE and now - self.last_hand >= self.idle_after:
+            self._switch(IDLE)
+            self.next_detect = now + self.detect_interval
+            self._has_thumbnail = False
+            if self.resolution is not None:
+                self._wanted_size = self.resolution
+
+    def apply_resolution(self, capture):
+        """Change the camera size if the state asks for it.
+
+        A LatestFrameGrabber runs the change on its reader thread between two
+        reads (VideoCapture is not thread-safe); any other capture is changed
+        right away, so call this from the thread that reads it.
+        """
+        size = self._wanted_size
+        if size is None or not hasattr(capture, 'set'):
+            return
+        self._wanted_size = None
+        if hasattr(capture, 'call_between_reads'):
+            capture.call_between_reads(lambda cap: self._resize(cap, size))
+        else:
+            self._resize(capture, size)
+
+    def _resize(self, capture, size):
+        if self._full_size is None:
+            self._full_size = self._camera_size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                                   int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        if size == FULL_SIZE:
+            size = self._full_size
+        if size == self._camera_size:
+            return
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        self._camera_size = size
+
+    def _moved(self, frame):
+        current, previous = self._thumbnails
+        cv2.resize(frame, MOTION_THUMBNAIL, dst=current, interpolation=cv2.INTER_AREA)
+        self._thumbnails.reverse()
+        if not self._has_thumbnail:
+            self._has_thumbnail = True
+            return False
+        cv2.absdiff(current, previous, dst=self._difference)
+        return cv2.mean(self._difference)[0] > self.motion_threshold
+
+    def _switch(self, state):
+        self._account()
+        self.state = state
+
+    def _account(self):
+        cpu, wall = time.process_time(), time.monotonic()
+        self.cpu[self.state] += cpu - self._cpu_mark
+        self.wall[self.state] += wall - self._wall_mark
+        self._cpu_mark, self._wall_mark = cpu, wall
+
+    def cpu_per_minute(self, state):
+        self._account()
+        return self.cpu[state] / self.wall[state] * 60 if self.wall[state] else 0.0
+
+    def summary(self):
+        active, idle = self.cpu_per_minute(ACTIVE), self.cpu_per_minute(IDLE)
+        return (f"Idle governor: active {self.wall[ACTIVE] / 60:.1f} min at {active:.1f} CPU s/min, "
+                f"idle {self.wall[IDLE] / 60:.1f} min at {idle:.1f} CPU s/min, "
+                f"{self.skipped} detections skipped, {self.wakeups} wake-ups")
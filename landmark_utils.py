@@ -0,0 +1,70 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+class LandmarkBuffer:
+    """Reusable (max_hands, 63) feature buffer filled from MediaPipe landmarks.
+
+    Rows use the training CSV layout: x0, y0, z0, x1, y1, z1, ... The
+    coordinates are written straight into the array through a flat
+    memoryview, so no per-frame lists or arrays are created. float32 is
+    what the classifier takes; float64 keeps the landmark values exactly as
+    MediaPipe returns them (e.g. for the training CSV).
+    """
+
+    def __init__(self, max_hands=1, dtype=np.float32):
+        self.dtype = dtype
+        self._allocate(max_hands)
+
+    def _allocate(self, max_hands):
+        self.max_hands = max_hands
+        self.array = np.zeros((max_hands, NUM_FEATURES), dtype=self.dtype)
+        self._flat = memoryview(self.array.reshape(-1))
+
+    def _write(self, index, hand_landmarks):
+        flat = self._flat
+        i = index * NUM_FEATURES
+        for landmark in hand_landmarks.landmark:
+            flat[i] = landmark.x
+            flat[i + 1] = landmark.y
+            flat[i + 2] = landmark.z
+            i += 3
+
+    def fill(self, multi_hand_landmarks):
+        """Copy every hand into the buffer and return the (n_hands, 63) view"""
+        n = len(multi_hand_landmarks)
+        if n > self.max_hands:
+            self._allocate(n)
+        for index in range(n):
+            self._write(index, multi_hand_landmarks[index])
+        return self.array[:n]
+
+    def fill_one(self, hand_landmarks):
+        """Copy a single hand into row 0 and return the (1, 63) view"""
+        self._write(0, hand_landmarks)
+        return self.array[:1]
+
+def hand_bounding_box(multi_hand_landmarks):
+    """(x_min, y_min, x_max, y_max) around every hand, in normalized coordinates"""
+    xs = [landmark.x for hand in multi_hand_landmarks for landmark in hand.landmark]
+    ys = [landmark.y for hand in multi_hand_landmarks for landmark in hand.landmark]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def map_landmarks_to_frame(multi_hand_landmarks, roi, frame_width, frame_height):
+    """Convert landmarks detected on a crop back to full-frame normalized coordinates (in place).
+
+    `roi` is the crop as (x0, y0, x1, y1) pixels. MediaPipe normalizes x and z
+    by the image width and y by its height, so x and z scale with the crop
+    width and y with the crop height.
+    """
+    x0, y0, x1, y1 = roi
+    scale_x = (x1 - x0) / frame_width
+    scale_y = (y1 - y0) / frame_height
+    offset_x = x0 / frame_width
+    offset_y = y0 / frame_height
+    for hand in multi_hand_landmarks:
+        for landmark in hand.landmark:
+            landmark.x = offset_x + landmark.x * scale_x
+            landmark.y = offset_y + landmark.y * scale_y
+            landmark.z = landmark.z * scale_x
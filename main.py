@@ -1,15 +1,62 @@
-from multiprocessing import Process
 import time
+_import_start = time.perf_counter()
 import json
 import os
-from message import control_message
-from gui_mode import control_gui_mode
-from systerm_control_by_handgesture import system_control
+from process_stats import ImportTimer, print_startup_stats, startup_stats
+import message_bus
+from supervisor import Supervisor
 
 MESSAGE_FILE_PATH = 'message.json'
+# Seconds the processes get to exit on their own after a shutdown before they are terminated
+SHUTDOWN_GRACE = 3.0
+# How often the supervisor checks the processes (seconds)
+SUPERVISE_INTERVAL = 0.5
 
-def monitor_status(processes):
+def get_runtime_config():
+    """The "RUNTIME" section of config.json ("message_bus": false falls back to the JSON files)"""
+    try:
+        with open('config.json', 'r') as f:
+            return json.load(f).get('RUNTIME', {})
+    except Exception:
+        return {}
+
+# Process targets import their modules lazily, so the supervisor and the Tk
+# processes never load mediapipe/cv2 (and spawned children do not re-import
+# them when they re-run this module).
+def run_message(bus=None):
+    with ImportTimer('message'):
+        from message import control_message
+    control_message(bus)
+
+def run_gui_mode(bus=None):
+    with ImportTimer('gui_mode'):
+        from gui_mode import control_gui_mode
+    control_gui_mode(bus)
+
+def run_system_control(bus=None):
+    with ImportTimer('system_control'):
+        from systerm_control_by_handgesture import system_control
+    system_control(bus)
+
+def monitor_bus(supervisor, bus):
+    """Forward the bus messages and supervise the processes until a shutdown arrives, then let them exit"""
+    endpoint = bus.endpoint(message_bus.BROKER)
     while True:
+        message = endpoint.get(timeout=SUPERVISE_INTERVAL)
+        if message is not None:
+            topic, payload = message
+            bus.deliver(topic, payload)
+            if topic == message_bus.SHUTDOWN:
+                break
+            if topic == message_bus.HEARTBEAT:
+                supervisor.heartbeat(payload)
+        supervisor.check()
+    print("Received stop command from the message bus. Exiting the whole program.")
+    supervisor.stop(SHUTDOWN_GRACE)
+
+def monitor_status(supervisor):
+    while True:
+        supervisor.check()
         try:
             with open(MESSAGE_FILE_PATH, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -21,25 +68,34 @@ def monitor_status(processes):
                     json.dump(data, f, ensure_ascii=False, indent=4)
                 print("Đã đặt lại status = true trong message.json.")
                 # Dừng tất cả process con
-                for p in processes:
+                for p in supervisor.processes:
                     if p.is_alive():
                         p.terminate()
+                print(f"Supervisor: {supervisor.stats()}")
                 break
         except Exception:
             pass
         time.sleep(1)
 
 if __name__ == "__main__":
-    p1 = Process(target=control_message)
-    p2 = Process(target=control_gui_mode)
-    p3 = Process(target=system_control)
-    processes = [p1, p2, p3]
-
-    for p in processes:
-        p.start()
+    print_startup_stats(startup_stats('main', time.perf_counter() - _import_start))
+    runtime_config = get_runtime_config()
+    bus = message_bus.MessageBus() if runtime_config.get('message_bus', True) else None
+    # Restarts crashed processes; heartbeats (hang detection) need the message bus
+    supervisor_config = runtime_config.get('supervisor', {})
+    supervisor = Supervisor(heartbeat_timeout=float(supervisor_config.get('heartbeat_timeout', 10)),
+                            startup_timeout=float(supervisor_config.get('startup_timeout', 60)),
+                            on_restart=bus.renew if bus is not None else None)
+    supervisor.add('message', run_message, (bus,), heartbeats=bus is not None)
+    supervisor.add('gui', run_gui_mode, (bus,), heartbeats=bus is not None)
+    supervisor.add('control', run_system_control, (bus,), heartbeats=bus is not None)
+    supervisor.start()
 
-    monitor_status(processes)  
+    if bus is not None:
+        monitor_bus(supervisor, bus)
+    else:
+        monitor_status(supervisor)  
 
-    for p in processes:
+    for p in supervisor.processes:
         p.join()
 
@@ -2,9 +2,13 @@ import tkinter as tk
 import json
 import os
 import time
+import message_bus
+from supervisor import Heartbeat
 
 MESSAGE_FILE_PATH = 'message.json'
 CHECK_INTERVAL_MS = 1000 
+# How often the overlay drains its message bus inbox
+BUS_POLL_INTERVAL_MS = 15
 
 if not os.path.exists(MESSAGE_FILE_PATH):
     initial_data = {"message": "Welcome to the application"}
@@ -43,6 +47,15 @@ def send_message_to_file(new_message: str, file_path: str = MESSAGE_FILE_PATH):
     except IOError as e:
         print(f"I/O error when writing to file '{file_path}': {e}")
 
+def send_message(new_message: str):
+    """Show a message in the overlay: over the message bus when connected, else through message.json"""
+    endpoint = message_bus.current_endpoint()
+    if endpoint is None:
+        send_message_to_file(new_message)
+        return
+    endpoint.publish(message_bus.NOTIFY, new_message)
+    print(f"Message '{new_message}' sent.")
+
 class MessageDisplayApp:
     def __init__(self, master):
         self.master = master
@@ -93,7 +106,12 @@ class MessageDisplayApp:
         self.shadow_label.config(text=truncated)
         self.last_displayed_message = truncated
 
-        self.check_for_updates()
+        self.endpoint = message_bus.current_endpoint()
+        if self.endpoint is not None:
+            self.heartbeat = Heartbeat(self.endpoint, 'message')
+            self.check_bus()
+        else:
+            self.check_for_updates()
 
     def _get_current_message(self):
         return get_message_from_file(MESSAGE_FILE_PATH)
@@ -120,9 +138,32 @@ class MessageDisplayApp:
         except Exception:
             return True  # If error, do not stop
 
+    def _show_message(self, message):
+        truncated = self._truncate_message(message)
+        if truncated != self.last_displayed_message:
+            self.message_label.config(text=truncated)
+            self.shadow_label.config(text=truncated)
+            self.last_displayed_message = truncated
+            self._reposition_window()
+            print(f"Message updated to: '{truncated}'")
+
+    def check_bus(self):
+        self.heartbeat.beat()
+        # Only the newest waiting message is shown
+        latest = None
+        for topic, payload in self.endpoint.poll():
+            if topic == message_bus.SHUTDOWN:
+                print("Received stop command from the message bus. Exiting program.")
+                self.master.destroy()
+                return
+            if topic == message_bus.NOTIFY:
+                latest = payload
+        if latest is not None:
+            self._show_message(latest)
+        self.master.after(BUS_POLL_INTERVAL_MS, self.check_bus)
+
     def check_for_updates(self):
         current_message = self._get_current_message()
-        truncated = self._truncate_message(current_message)
 
         # Check status, if false then stop program
         if not self._get_current_status():
@@ -130,16 +171,12 @@ class MessageDisplayApp:
             self.master.destroy()
             return
 
-        if truncated != self.last_displayed_message:
-            self.message_label.config(text=truncated)
-            self.shadow_label.config(text=truncated)
-            self.last_displayed_message = truncated
-            self._reposition_window()
-            print(f"Message updated to: '{truncated}'")
+        self._show_message(current_message)
 
         self.master.after(CHECK_INTERVAL_MS, self.check_for_updates)
 
-def control_message():
+def control_message(bus=None):
+    message_bus.connect(bus, 'message')
     root = tk.Tk()
     app = MessageDisplayApp(root)
     root.mainloop()
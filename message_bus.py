@@ -0,0 +1,147 @@
+import multiprocessing
+import queue
+import threading
+
+# Topics and the endpoints (processes) that receive them
+NOTIFY = 'notify'      # overlay text, payload: str
+MODE = 'mode'          # mode change, payload: {"current_mode": "VIDEO" | "SLIDE"}
+SHUTDOWN = 'shutdown'  # stop everything, payload: None
+HEARTBEAT = 'heartbeat'  # worker is alive, payload: endpoint name
+
+# The endpoint of main.py, which forwards every published message to the subscribers
+BROKER = 'main'
+
+SUBSCRIPTIONS = {
+    NOTIFY: ('message',),
+    MODE: ('control',),
+    SHUTDOWN: ('main', 'message', 'control'),
+    HEARTBEAT: ('main',),
+}
+
+class MessageBus:
+    """In-memory publish/subscribe between the processes started by main.py.
+
+    Every endpoint (process) has a multiprocessing.Queue as its inbox;
+    `publish` puts a (topic, payload) message into the inbox of the broker
+    (main.py), which hands it to the inbox of each other subscriber of the
+    topic with `deliver`. `put` only hands the message to the queue's
+    feeder thread, so publishing never blocks the caller on another process
+    or on the disk. The bus is created in main.py and passed to each
+    process, which calls `connect` with its endpoint name.
+
+    Only the broker writes to the inbox of a worker, so a restarted worker
+    can be given a fresh inbox with `renew`: a worker terminated while
+    reading its inbox can leave that queue's lock held for good.
+    """
+
+    def __init__(self, endpoints=('main', 'message', 'gui', 'control')):
+        self.inboxes = {name: multiprocessing.Queue() for name in endpoints}
+
+    def publish(self, topic, payload=None):
+        self.inboxes[BROKER].put((topic, payload))
+
+    def deliver(self, topic, payload=None):
+        """Forward a published message to its subscribers; called by the broker for every message"""
+        for name in SUBSCRIPTIONS.get(topic, ()):
+            inbox = self.inboxes.get(name)
+            if inbox is not None and name != BROKER:
+                inbox.put((topic, payload))
+
+    def renew(self, name):
+        """Replace the inbox of `name` before its process is started again (broker side)"""
+        old = self.inboxes.get(name)
+        self.inboxes[name] = multiprocessing.Queue()
+        if old is not None:
+            # Nobody reads the old queue any more: do not wait for its pending messages on exit
+            old.cancel_join_thread()
+            old.close()
+
+    def endpoint(self, name):
+        return Endpoint(self, name)
+
+class Slot:
+    """Latest payload received on a topic, with a version that goes up on every message.
+
+    Same interface as config_watcher.WatchedFile (`value`, `version`), so the
+    control loop can read a mode from either one.
+    """
+
+    def __init__(self, value=None):
+        self.value = value
+        self.version = 0
+
+    def set(self, value):
+        self.value = value
+        self.version += 1
+
+class Endpoint:
+    """One process's side of the bus: publish, and receive what its inbox gets"""
+
+    def __init__(self, bus, name):
+        self.bus = bus
+        self.name = name
+        self.inbox = bus.inboxes[name]
+        self.slots = {}
+        self.handlers = {}
+        self._thread = None
+
+    def publish(self, topic, payload=None):
+        self.bus.publish(topic, payload)
+
+    def slot(self, topic, initial=None):
+        """Slot kept up to date with the latest payload on `topic` (needs `listen`)"""
+        self.slots[topic] = Slot(initial)
+        return self.slots[topic]
+
+    def on(self, topic, handler):
+        """Call `handler(payload)` from the listener thread for each message on `topic`"""
+        self.handlers[topic] = handler
+
+    def listen(self):
+        """Receive messages on a background thread and dispatch them to slots and handlers"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f'bus-{self.name}', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                topic, payload = self.inbox.get()
+            except (EOFError, OSError):
+                return
+            self._dispatch(topic, payload)
+
+    def _dispatch(self, topic, payload):
+        if topic in self.slots:
+            self.slots[topic].set(payload)
+        if topic in self.handlers:
+            self.handlers[topic](payload)
+
+    def poll(self):
+        """Messages waiting in the inbox, without blocking (for loops that own their thread, e.g. Tk)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def get(self, timeout=None):
+        """Next (topic, payload), or None after `timeout` seconds"""
+        try:
+            return self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+# Endpoint of this process, set by connect(); None means file-based messaging
+_endpoint = None
+
+def connect(bus, name):
+    """Attach this process to the bus as `name`; None keeps the file-based fallback"""
+    global _endpoint
+    _endpoint = bus.endpoint(name) if bus is not None else None
+    return _endpoint
+
+def current_endpoint():
+    return _endpoint
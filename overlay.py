@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+# Hand skeleton as polylines over the 21 MediaPipe landmarks (thumb, fingers, palm)
+HAND_POLYLINES = (
+    (0, 1, 2, 3, 4),
+    (5, 6, 7, 8),
+    (9, 10, 11, 12),
+    (13, 14, 15, 16),
+    (0, 17, 18, 19, 20),
+    (0, 5, 9, 13, 17),
+)
+
+TEXT_COLOR = (0, 255, 0)
+HAND_COLOR = (0, 200, 255)
+
+def draw_gesture_text(frame, idx, gesture_name):
+    y_pos = 30 + idx * 40  # Each hand is 40px apart vertically
+    cv2.putText(frame, f"Hand {idx+1}: {gesture_name}", (10, y_pos),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, TEXT_COLOR, 2)
+
+def draw_stage_metrics(frame, summary):
+    """p50 / p95 / p99 per stage (a StageMetrics summary) in the bottom-left corner"""
+    stages = summary.get('stages', {})
+    y_pos = frame.shape[0] - 10 - 18 * (len(stages) - 1)
+    for stage, entry in stages.items():
+        cv2.putText(frame, f"{stage}: {entry['p50_ms']:.1f} / {entry['p95_ms']:.1f} / {entry['p99_ms']:.1f} ms",
+                    (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.45, TEXT_COLOR, 1)
+        y_pos += 18
+
+class MediaPipeRenderer:
+    """MediaPipe's drawing_utils: landmark circles plus every connection, one call per item"""
+
+    def __init__(self):
+        import mediapipe as mp
+        self.mp_draw = mp.solutions.drawing_utils
+        self.connections = mp.solutions.hands.HAND_CONNECTIONS
+
+    def draw_hand(self, frame, hand_landmarks):
+        self.mp_draw.draw_landmarks(frame, hand_landmarks, self.connections)
+
+class FastRenderer:
+    """Draw the hand skeleton with a single vectorized cv2.polylines call"""
+
+    def __init__(self):
+        self._lengths = [len(line) for line in HAND_POLYLINES]
+        self._index = np.concatenate(HAND_POLYLINES)
+        self._splits = np.cumsum(self._lengths)[:-1]
+        self._points = np.empty((21, 2), dtype=np.float32)
+        self._pixels = np.empty((len(self._index), 2), dtype=np.int32)
+        # Views into _pixels, one per polyline, so each frame only refills _pixels
+        self._lines = np.split(self._pixels, self._splits)
+
+    def draw_hand(self, frame, hand_landmarks):
+        height, width = frame.shape[:2]
+        points = self._points
+        for i, landmark in enumerate(hand_landmarks.landmark):
+            points[i, 0] = landmark.x
+            points[i, 1] = landmark.y
+        np.multiply(points[self._index], (width, height), out=self._pixels, casting='unsafe')
+        cv2.polylines(frame, self._lines, False, HAND_COLOR, 2, cv2.LINE_8)
+
+RENDERERS = {
+    'mediapipe': MediaPipeRenderer,
+    'fast': FastRenderer,
+}
+
+def make_renderer(name):
+    if name not in RENDERERS:
+        print(f"Unknown overlay renderer '{name}', using 'mediapipe'.")
+        name = 'mediapipe'
+    return RENDERERS[name]()
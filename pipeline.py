@@ -0,0 +1,152 @@
+import collections
+import threading
+
+# Drop policies of a BoundedQueue when it is full
+BLOCK = 'block'              # wait for the consumer (never drop)
+DROP_OLDEST = 'drop_oldest'  # replace the oldest queued item (keep latency low)
+DROP_NEWEST = 'drop_newest'  # discard the item being put
+DROP_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+_END = object()
+
+class BoundedQueue:
+    """FIFO queue with a maximum size and a drop policy for when it is full.
+
+    `on_drop(item)` is called with every dropped item, e.g. to give its
+    buffers back.
+    """
+
+    def __init__(self, maxsize=2, policy=DROP_OLDEST, on_drop=None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}', expected one of {DROP_POLICIES}.")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items = collections.deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, item, force=False):
+        """Queue an item; `force` bypasses the size limit (used for the end marker)"""
+        with self._condition:
+            if not force:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    if self.policy == DROP_OLDEST:
+                        self._drop(self._items.popleft())
+                        break
+                    if self.policy == DROP_NEWEST:
+                        self._drop(item)
+                        return
+                    self._condition.wait()
+                if self._closed:
+                    return
+            self._items.append(item)
+            self._condition.notify_all()
+
+    def _drop(self, item):
+        self.dropped += 1
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def get(self):
+        """Return the next item, or the end marker once the queue is closed and empty"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed)
+            if not self._items:
+                return _END
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+class Pipeline:
+    """Run a source and a chain of stages on worker threads linked by bounded queues.
+
+    `source()` returns the next item or None at the end of the stream; every
+    stage is a `(name, fn)` pair whose `fn(item)` returns the item for the
+    next stage. Iterating over the pipeline yields the output of the last
+    stage, in source order, on the calling thread (so OpenCV windows can be
+    drawn there). `policies` maps a producer name ('source' or a stage name)
+    to the drop policy of the queue it writes to, and `on_drop` to a
+    function called with each item dropped from that queue.
+    """
+
+    def __init__(self, source, stages, queue_size=2, policies=None, on_drop=None):
+        policies = policies or {}
+        on_drop = on_drop or {}
+        self.producers = ['source'] + [name for name, _ in stages]
+        self.queues = {name: BoundedQueue(queue_size, policies.get(name, DROP_OLDEST),
+                                          self._unwrap(on_drop.get(name)))
+                       for name in self.producers}
+        self._stopped = False
+        self._error = None
+        self._threads = [threading.Thread(target=self._run_source, args=(source, self.queues['source']),
+                                          name='pipeline-source', daemon=True)]
+        for (name, fn), producer in zip(stages, self.producers):
+            self._threads.append(threading.Thread(
+                target=self._run_stage, args=(fn, self.queues[producer], self.queues[name]),
+                name=f'pipeline-{name}', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _unwrap(on_drop):
+        # Queued items are (sequence, payload)
+        return (lambda item: on_drop(item[1])) if on_drop is not None else None
+
+    def _run_source(self, source, output):
+        sequence = 0
+        try:
+            while not self._stopped:
+                item = source()
+                if item is None:
+                    break
+                output.put((sequence, item))
+                sequence += 1
+        except Exception as e:
+            self._error = e
+        output.put(_END, force=True)
+
+    def _run_stage(self, fn, input_queue, output):
+        try:
+            while not self._stopped:
+                item = input_queue.get()
+                if item is _END:
+                    break
+                sequence, payload = item
+                output.put((sequence, fn(payload)))
+        except Exception as e:
+            self._error = e
+        output.put(_END, force=True)
+
+    def __iter__(self):
+        output = self.queues[self.producers[-1]]
+        last_sequence = -1
+        while True:
+            item = output.get()
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            sequence, payload = item
+            # Items can be dropped but never reordered
+            assert sequence > last_sequence
+            last_sequence = sequence
+            yield payload
+
+    def stop(self):
+        """Stop every worker and wait until none of them is still running a stage"""
+        self._stopped = True
+        for queue in self.queues.values():
+            queue.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def stats(self):
+        return {name: queue.dropped for name, queue in self.queues.items()}
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+import numpy as np
+
+class PredictionCache:
+    """Bounded LRU cache of (class, confidence) keyed on quantized landmarks.
+
+    The key is the hand's landmarks relative to the wrist (landmark 0),
+    snapped to a grid of `grid_size` normalized units, so a held gesture
+    maps to the same key from frame to frame. Entries belong to one model
+    and are dropped as soon as a different model object is passed to `sync`.
+    """
+
+    def __init__(self, grid_size=0.01, capacity=256):
+        self.grid_size = grid_size
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._model = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def sync(self, model):
+        """Invalidate every entry if the model was reloaded since the last call"""
+        if model is not self._model:
+            self._entries.clear()
+            self._model = model
+
+    def key(self, row):
+        points = row.reshape(-1, 3)
+        relative = points - points[0]
+        return np.rint(relative / self.grid_size).astype(np.int16).tobytes()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+# Modules that dominate import time and memory; only the process that needs them should load them
+HEAVY_MODULES = ('tensorflow', 'mediapipe', 'cv2', 'pyautogui', 'h5py', 'sklearn', 'pystray', 'PIL', 'numpy')
+
+def rss_mb():
+    """Resident set size of this process in MB (None if it cannot be measured)"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open(f'/proc/{os.getpid()}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def startup_stats(name, import_seconds):
+    rss = rss_mb()
+    return {
+        'process': name,
+        'pid': os.getpid(),
+        'import_s': round(import_seconds, 3),
+        'rss_mb': round(rss, 1) if rss is not None else None,
+        'heavy_modules': loaded_heavy_modules(),
+    }
+
+def print_startup_stats(stats):
+    rss = f"{stats['rss_mb']:.1f} MB" if stats['rss_mb'] is not None else "n/a"
+    heavy = ', '.join(stats['heavy_modules']) or '-'
+    print(f"[startup] {stats['process']} (pid {stats['pid']}): imports {stats['import_s']:.3f} s, "
+          f"RSS {rss}, heavy modules: {heavy}")
+
+class ImportTimer:
+    """Context manager that measures the imports of one process and prints its startup stats"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.stats = startup_stats(self.name, time.perf_counter() - self._start)
+            print_startup_stats(self.stats)
+        return False
@@ -0,0 +1,190 @@
+import argparse
+import collections
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_DIR = 'profiles'
+# Written by `python profiler.py --seconds N` to profile a running system_control
+REQUEST_FILE_PATH = 'profile_request.json'
+# Profile the first N seconds after system_control starts
+PROFILE_ENV_VAR = 'GESTURE_PROFILE'
+TOP_FUNCTIONS = 30
+# Numbers the profiles of this process, so two written in the same second do not collide
+_profile_numbers = itertools.count(1)
+
+class SamplingProfiler:
+    """Sample the stacks of every thread of the process from a background thread.
+
+    Every `interval` seconds `sys._current_frames()` is read and each stack
+    counted, so the profiled code runs untouched (unlike cProfile, nothing
+    is hooked into every call). At the end, the stacks are written as
+    collapsed stacks (one "thread;outer;...;inner count" line per stack,
+    the input of flamegraph.pl and speedscope) and a summary of the
+    functions with the most samples. Time spent sampling is measured and
+    reported as a share of the profiled time.
+    """
+
+    def __init__(self, interval=0.01, directory=PROFILE_DIR):
+        self.interval = interval
+        self.directory = directory
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.elapsed = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds, on_done=None):
+        """Profile for `seconds` in the background, then write the results and call `on_done(paths)`"""
+        self._thread = threading.Thread(target=self._run, args=(seconds, on_done), name='SamplingProfiler',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """End the profile early; the results are still written"""
+        self._stop.set()
+        if self.running and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def sample(self):
+        started = time.perf_counter()
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f'thread-{ident}'))
+            self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+        self.sampling_time += time.perf_counter() - started
+
+    def _run(self, seconds, on_done):
+        started = time.perf_counter()
+        deadline = started + seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            self.sample()
+        self.elapsed = time.perf_counter() - started
+        paths = self.write()
+        if on_done is not None:
+            on_done(paths)
+
+    def overhead(self):
+        return self.sampling_time / self.elapsed if self.elapsed else 0.0
+
+    def collapsed(self):
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit=TOP_FUNCTIONS):
+        """Lines of the functions with the most samples: on top of the stack (self) and anywhere (total)"""
+        own, total = collections.Counter(), collections.Counter()
+        samples = sum(self.stacks.values()) or 1
+        for stack, count in self.stacks.items():
+            # stack[0] is the thread name
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                total[label] += count
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f} ms over {self.elapsed:.1f} s, "
+                 f"sampling cost {self.overhead() * 100:.2f}% of the time",
+                 "Percentages are of the sampled thread stacks.",
+                 '',
+                 f"{'self %':>8}{'total %':>9}  function"]
+        for label, count in own.most_common(limit):
+            lines.append(f"{count / samples * 100:>8.1f}{total[label] / samples * 100:>9.1f}  {label}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """Write <name>.collapsed and <name>.txt to the profile directory; returns their paths"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('profile_%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_profile_numbers)}"
+        base = os.path.join(self.directory, name)
+        paths = (base + '.collapsed', base + '.txt')
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        with open(paths[1], 'w', encoding='utf-8') as f:
+            f.write(self.top_functions())
+        return paths
+
+class ProfileSwitch:
+    """Start one SamplingProfiler at a time, on request.
+
+    Requests come from the GESTURE_PROFILE environment variable (seconds,
+    at startup) or the request file written by `python profiler.py
+    --seconds N`; their payload is {"seconds": N} with an optional
+    "interval".
+    """
+
+    def __init__(self, interval=0.01, directory=PROFILE_DIR):
+        self.interval = interval
+        self.directory = directory
+        self.profiler = None
+
+    def request(self, payload):
+        payload = payload if isinstance(payload, dict) else {}
+        try:
+            seconds = float(payload.get('seconds', 30))
+            interval = float(payload.get('interval', self.interval))
+        except (TypeError, ValueError):
+            print(f"Invalid profile request: {payload}")
+            return False
+        if self.profiler is not None and self.profiler.running:
+            print("A profile is already running, ignoring the request.")
+            return False
+        print(f"Profiling for {seconds:g} s (a sample every {interval * 1000:.0f} ms).")
+        self.profiler = SamplingProfiler(interval, self.directory).start(seconds, self._done)
+        return True
+
+    def request_from_env(self):
+        seconds = os.environ.get(PROFILE_ENV_VAR)
+        if seconds:
+            self.request({'seconds': seconds})
+
+    def request_from_file(self, path=REQUEST_FILE_PATH):
+        """Parse function for ConfigWatcher: each new request file starts a profile, then is removed"""
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        os.remove(path)
+        self.request(payload)
+        return payload
+
+    def _done(self, paths):
+        print(f"Profile written to '{paths[0]}' (collapsed stacks) and '{paths[1]}' "
+              f"(top functions, sampling cost {self.profiler.overhead() * 100:.2f}%).")
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask the running gesture control loop for a profile.")
+    parser.add_argument('--seconds', type=float, default=30, help="how long to profile")
+    parser.add_argument('--interval', type=float, help="seconds between two samples")
+    args = parser.parse_args()
+    request = {'seconds': args.seconds}
+    if args.interval:
+        request['interval'] = args.interval
+    with open(REQUEST_FILE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(request, f)
+    print(f"Requested a {args.seconds:g} s profile; results go to '{PROFILE_DIR}/'.")
+
+if __name__ == "__main__":
+    main()
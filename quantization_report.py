@@ -0,0 +1,87 @@
+import json
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from gesture_inference import build_model, load_layers
+
+# --- config ---
+CSV_FILE_NAME = 'gesture_data_auto_record.csv'
+QUANTIZED_BACKENDS = ('int8', 'float16')
+LATENCY_CALLS = 2000
+# A backend that agrees with the float model on fewer held-out samples fails the report
+MIN_AGREEMENT = 0.99
+
+def load_label_names():
+    try:
+        with open('config.json', 'r') as f:
+            return {int(k): v for k, v in json.load(f).get('VIDEO', {}).items()}
+    except Exception:
+        return {}
+
+def held_out_split():
+    """Recreate the test split of train_model.py (same test_size, seed and stratification)"""
+    df = pd.read_csv(CSV_FILE_NAME)
+    X = df.iloc[:, :-1].values
+    y = df.iloc[:, -1].values.astype(int)
+    num_classes = len(np.unique(y)) + 1
+    y_onehot = np.eye(num_classes)[y]
+    _, X_test, _, y_test = train_test_split(X, y_onehot, test_size=0.2, random_state=42, stratify=y_onehot)
+    return X_test, np.argmax(y_test, axis=1)
+
+def latency_percentiles_us(model, rows):
+    """p50/p99 latency of single-row predictions, the way the control loop calls the model"""
+    for row in rows[:20]:
+        model.predict(row[None, :])
+    timings = np.empty(LATENCY_CALLS)
+    for i in range(LATENCY_CALLS):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        model.predict(row)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50) * 1e6, np.percentile(timings, 99) * 1e6
+
+def main():
+    try:
+        X_test, y_test = held_out_split()
+    except FileNotFoundError:
+        print(f"Error: '{CSV_FILE_NAME}' not found. Record data with 'record_and_collect_data.py' first.")
+        return 1
+    layers, loaded_from = load_layers()
+    label_names = load_label_names()
+    print(f"Model: '{loaded_from}', held-out samples: {len(X_test)}")
+
+    backends = ('float',) + QUANTIZED_BACKENDS
+    models = {backend: build_model(layers, backend) for backend in backends}
+    predictions = {backend: np.argmax(model.predict(X_test), axis=1) for backend, model in models.items()}
+
+    # --- accuracy per class ---
+    print(f"\n{'class':<16}{'samples':>8}" + ''.join(f"{b:>10}" for b in backends))
+    for label in np.unique(y_test):
+        mask = y_test == label
+        name = label_names.get(int(label), str(label))
+        accuracies = ''.join(f"{np.mean(predictions[b][mask] == label):>10.4f}" for b in backends)
+        print(f"{name:<16}{int(mask.sum()):>8}{accuracies}")
+    overall = ''.join(f"{np.mean(predictions[b] == y_test):>10.4f}" for b in backends)
+    print(f"{'overall':<16}{len(y_test):>8}{overall}")
+
+    # --- agreement and latency ---
+    print(f"\n{'backend':<10}{'agreement':>11}{'p50 (us)':>11}{'p99 (us)':>11}")
+    failed = []
+    for backend, model in models.items():
+        agreement = np.mean(predictions[backend] == predictions['float'])
+        p50, p99 = latency_percentiles_us(model, X_test)
+        flag = '  FAILED' if agreement < MIN_AGREEMENT else ''
+        print(f"{backend:<10}{agreement:>11.4f}{p50:>11.1f}{p99:>11.1f}{flag}")
+        if agreement < MIN_AGREEMENT:
+            failed.append(backend)
+    if failed:
+        print(f"\nFAILED: {', '.join(failed)} agree with the float model on less than "
+              f"{MIN_AGREEMENT * 100:.0f}% of the held-out samples.")
+        return 1
+    print("\nSet \"backend\" in the \"RUNTIME\" section of config.json to use a quantized model.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,17 +4,25 @@ import numpy as np
 import csv
 import os
 import time
+from landmark_utils import LandmarkBuffer
+from frame_sources import open_camera
 
 # --- config ---
 RECORD_DURATION_SECONDS = 30
 OUTPUT_VIDEO_DIR = 'recorded_gestures' 
 CSV_FILE_NAME = 'gesture_data_auto_record.csv' 
+# read the camera on a background thread and always use the newest frame; off here because
+# the recording must keep every frame (dropped frames make the video play back sped up)
+USE_THREADED_CAPTURE = False
 
 # define MediaPipe Hands
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.5)
 mp_draw = mp.solutions.drawing_utils
 
+# reusable feature buffer, one row per detected hand; float64 so the CSV gets the landmark values unchanged
+landmark_buffer = LandmarkBuffer(max_hands=2, dtype=np.float64)
+
 # labels for gestures
 gestures = {
     0: "Unknown", 
@@ -58,31 +66,34 @@ def process_recorded_video_and_save_landmarks(video_path, gesture_id):
     print(f"\nStarting processing video '{os.path.basename(video_path)}' for gesture '{gestures.get(gesture_id, 'N/A')}'...")
     collected_samples = 0
     frame_count = 0
+    # reusable frame buffers (decoded BGR frame and its RGB copy for MediaPipe)
+    frame = None
+    rgb_frame = None
 
     while cap.isOpened():
-        ret, frame = cap.read()
+        ret, frame = cap.read(frame)
         if not ret:
             break
 
         frame_count += 1
         # Change color from BGR (OpenCV) to RGB (MediaPipe)
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if rgb_frame is None or rgb_frame.shape != frame.shape:
+            rgb_frame = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
         # Process the image with MediaPipe Hands
-        results = hands.process(image)
-        # Convert RGB back to BGR
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        results = hands.process(rgb_frame)
+        # Draw on the original BGR frame (no RGB -> BGR conversion needed)
+        image = frame
 
         # Check if any hands are detected
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+            features = landmark_buffer.fill(results.multi_hand_landmarks)
+            for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
                 # Draw landmarks on the frame (optional)
                 mp_draw.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-                landmark_row = []
-                for landmark in hand_landmarks.landmark:
-                    landmark_row.extend([landmark.x, landmark.y, landmark.z])
-
-                if len(landmark_row) == num_landmarks * 3:
+                if len(hand_landmarks.landmark) == num_landmarks:
+                    landmark_row = features[idx].tolist()
                     landmark_row.append(gesture_id)
                     with open(CSV_FILE_NAME, 'a', newline='') as f:
                         writer = csv.writer(f)
@@ -105,13 +116,15 @@ def process_recorded_video_and_save_landmarks(video_path, gesture_id):
     return collected_samples
 
 def main():
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0, threaded=USE_THREADED_CAPTURE)
     if not cap.isOpened():
         print("Error: Can't open camera.")
         return
 
     total_samples_collected_overall = 0
     recording = False
+    flipped_frame = None
+    display_frame = None
     out = None # VideoWriter object
 
     # display text variables
@@ -127,8 +140,12 @@ def main():
         if not ret:
             break
 
-        frame = cv2.flip(frame, 1) 
-        display_frame = frame.copy() 
+        # mirror and copy into reusable buffers instead of allocating new frames
+        if flipped_frame is None or flipped_frame.shape != frame.shape:
+            flipped_frame = np.empty_like(frame)
+            display_frame = np.empty_like(frame)
+        frame = cv2.flip(frame, 1, dst=flipped_frame) 
+        np.copyto(display_frame, frame) 
         
         if not recording:
             # Display gesture options
@@ -198,6 +215,8 @@ def main():
             out = cv2.VideoWriter(video_filepath, fourcc, fps, (width, height))
             print(f"Started recording for gesture {gestures[current_gesture_id]} to '{video_filepath}'...")
 
+    if hasattr(cap, 'dropped'):
+        print(f"Camera frames dropped while busy: {cap.dropped}")
     cap.release()
     if out is not None:
         out.release() # Ensure VideoWriter is released if program exits early
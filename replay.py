@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from types import SimpleNamespace
+import numpy as np
+import systerm_control_by_handgesture as control
+from action_backends import RecordingBackend
+from action_dispatcher import ActionDispatcher
+from frame_sources import (ImageDirSource, LandmarkLogSource, LandmarkLogWriter,
+                           VideoFileSource)
+
+# Stand-in frame for landmark replays, which have no camera image
+BLANK_FRAME_SHAPE = (480, 640, 3)
+
+class ReplaySession(control.CaptureSession):
+    """CaptureSession over a recorded source; never follows mode_config.json.
+
+    With `landmark_log`, the landmarks MediaPipe finds are also written to a
+    landmark log, which can then be replayed without MediaPipe.
+    """
+
+    def __init__(self, source, preview=False, landmark_log=None):
+        super().__init__('Gesture Replay', capture=source, preview=preview)
+        # Deterministic: every recorded frame is processed, in order
+        self.pipelined = False
+        self.governor = None
+        self.landmark_log = landmark_log
+
+    def detect(self, frame):
+        frame, results = super().detect(frame)
+        if self.landmark_log is not None:
+            self.landmark_log.write(self.cap.timestamp, results.multi_hand_landmarks)
+        return frame, results
+
+    def requested_mode(self):
+        return None
+
+    def close(self):
+        super().close()
+        if self.landmark_log is not None:
+            self.landmark_log.close()
+
+class LandmarkReplaySession(ReplaySession):
+    """ReplaySession over a landmark log: no image processing and no MediaPipe"""
+
+    def __init__(self, source, preview=False):
+        super().__init__(source, preview)
+        self._blank_frame = np.zeros(BLANK_FRAME_SHAPE, dtype=np.uint8)
+
+    def configure(self, max_num_hands):
+        self.max_num_hands = max_num_hands
+
+    def detect(self, hands):
+        if self.rendering:
+            self._blank_frame.fill(0)
+        hands = hands[:self.max_num_hands]
+        return self._blank_frame, SimpleNamespace(multi_hand_landmarks=hands or None)
+
+    def recycle(self, frame):
+        # The blank frame is reused as is
+        pass
+
+class EventRecorder:
+    """Collect what the mode handler does, stamped with recording time.
+
+    With `dispatch`, actions are also sent through the action dispatcher
+    (to a RecordingBackend) and the wall time of each accepted one is kept
+    in `triggered`, to compare with the backend's log.
+    """
+
+    def __init__(self, source, echo=True, dispatch=False):
+        self.source = source
+        self.echo = echo
+        self.dispatch = dispatch
+        self.events = []
+        self.triggered = []
+        self.gestures = Counter()
+
+    def _add(self, kind, value):
+        event = {'t': round(self.source.timestamp, 3), 'frame': self.source.frames_read, kind: value}
+        self.events.append(event)
+        if self.echo:
+            print(f"[{event['t']:8.3f}s] {kind}: {value}")
+
+    def notify(self, message):
+        self._add('message', message)
+
+    def perform(self, name):
+        self._add('action', name)
+        if self.dispatch:
+            triggered = time.perf_counter()
+            if control.dispatch_action(name):
+                self.triggered.append(triggered)
+        return True
+
+    def observe(self, handler):
+        """Count every gesture the handler receives"""
+        on_gesture = handler.on_gesture
+
+        def observed(gesture):
+            self.gestures[control.GESTURES.get(gesture, 'Unknown')] += 1
+            return on_gesture(gesture)
+        handler.on_gesture = observed
+
+def report_action_latency(triggered, backend, elapsed):
+    """Gesture-to-action latency: from the frame that completed a sequence to the backend call.
+
+    Each action ends with exactly one non-focus backend call, in dispatch order.
+    """
+    done = [entry['t'] for entry in backend.log if entry['action'] != 'focus_window']
+    latencies = sorted((end - start) * 1000 for start, end in zip(triggered, done))
+    if not latencies:
+        print("No actions were dispatched.")
+        return
+    print(f"Dispatched {len(latencies)} actions ({len(latencies) / elapsed:.1f}/s); gesture-to-action latency "
+          f"p50 {latencies[len(latencies) // 2]:.2f} ms, max {latencies[-1]:.2f} ms.")
+
+def open_source(path, fps, realtime):
+    if path.endswith('.jsonl'):
+        return LandmarkLogSource(path, realtime)
+    if os.path.isdir(path):
+        return ImageDirSource(path, fps, realtime)
+    return VideoFileSource(path, realtime)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the gesture control loop on a recorded video, an image directory "
+                    "or a landmark log (.jsonl) instead of the camera. No OS actions are sent.")
+    parser.add_argument('source', help="video file, directory of images or landmark log (.jsonl)")
+    parser.add_argument('--mode', default='VIDEO', choices=sorted(control.MODE_HANDLERS))
+    parser.add_argument('--realtime', action='store_true',
+                        help="deliver frames at the recorded frame rate instead of as fast as possible")
+    parser.add_argument('--fps', type=float, default=30.0, help="frame rate of an image directory")
+    parser.add_argument('--preview', action='store_true', help="show the preview window")
+    parser.add_argument('--save-landmarks', metavar='PATH',
+                        help="also write the tracked landmarks to a landmark log for later replays")
+    parser.add_argument('--events', metavar='PATH', help="write the messages and actions as JSON")
+    parser.add_argument('--quiet', action='store_true', help="do not print each event")
+    parser.add_argument('--dispatch', metavar='LOG', nargs='?', const='',
+                        help="also run the actions through the action dispatcher into a recording "
+                             "backend (optionally logged to LOG as JSON lines) and report their latency")
+    args = parser.parse_args()
+
+    source = open_source(args.source, args.fps, args.realtime)
+    if not source.isOpened():
+        print(f"Error: Can't open '{args.source}'.")
+        return
+    if not control.init_model():
+        return
+    if isinstance(source, LandmarkLogSource):
+        session = LandmarkReplaySession(source, args.preview)
+    else:
+        landmark_log = LandmarkLogWriter(args.save_landmarks) if args.save_landmarks else None
+        session = ReplaySession(source, args.preview, landmark_log)
+
+    # Recording time drives the sequence timeouts and the motion gate, so replays are repeatable
+    control.clock = source.clock
+    control.GESTURES = control.get_gesture_mappings(args.mode)
+    dispatching = args.dispatch is not None
+    recorder = EventRecorder(source, echo=not args.quiet, dispatch=dispatching)
+    if dispatching:
+        # The whole log is compared with the dispatched actions
+        backend = RecordingBackend(args.dispatch or None, max_log=None)
+        control.set_action_backend(backend)
+        control.dispatcher = ActionDispatcher(control.perform_action, debounce=float(
+            control.get_runtime_config().get('actions', {}).get('debounce', 0.2)))
+    handler = control.MODE_HANDLERS[args.mode](notify=recorder.notify, perform=recorder.perform)
+    recorder.observe(handler)
+
+    start = time.perf_counter()
+    try:
+        control.run_mode(session, handler)
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - start
+    if dispatching:
+        control.dispatcher.close()
+        backend.close()
+
+    frames = source.frames_read
+    print(f"Replayed {frames} frames ({source.timestamp:.1f}s of recording) in {elapsed:.2f}s, "
+          f"{frames / elapsed if elapsed else 0:.1f} fps.")
+    print(f"Gestures: {dict(recorder.gestures)}")
+    print(f"Actions: {Counter(e['action'] for e in recorder.events if 'action' in e)}")
+    if dispatching:
+        report_action_latency(recorder.triggered, backend, elapsed)
+    if args.events:
+        with open(args.events, 'w', encoding='utf-8') as f:
+            json.dump(recorder.events, f, ensure_ascii=False, indent=4)
+        print(f"Events written to '{args.events}'.")
+
+if __name__ == "__main__":
+    main()
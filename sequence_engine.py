@@ -0,0 +1,200 @@
+TIMEOUT_MESSAGE = "Time out! Canceling action."
+MAIN_LAYER = 'main'
+NO_EFFECTS = ()
+
+class Sequence:
+    """A configured gesture sequence and what completing it does.
+
+    `message` is sent when the first step is made and `done_message` on
+    completion, after `action`. `enter` switches to another layer (e.g.
+    volume mode) and `exit` goes back to the main layer. `cooldown` ignores
+    gestures for that many seconds afterwards. A single-step `anytime`
+    sequence also fires while another sequence of its layer is in progress.
+    """
+
+    def __init__(self, name, steps, timeouts, action=None, message=None, done_message=None,
+                 enter=None, exit=False, cooldown=0.0, anytime=False):
+        self.name = name
+        self.steps = steps
+        self.timeouts = timeouts
+        self.action = action
+        self.message = message
+        self.done_message = done_message
+        self.enter = enter
+        self.exit = exit
+        self.cooldown = cooldown
+        self.anytime = anytime
+
+class Node:
+    """Trie node: every sequence whose steps start with the path to this node"""
+
+    __slots__ = ('children', 'sequence', 'timeout', 'message')
+
+    def __init__(self):
+        self.children = {}
+        self.sequence = None
+        # Seconds allowed for the next step (None: no limit)
+        self.timeout = 0.0
+        self.message = None
+
+class Layer:
+    """The sequences that can run together, compiled into a trie of gesture steps"""
+
+    def __init__(self, name):
+        self.name = name
+        self.root = Node()
+        self.anytime = {}
+        self.sequences = []
+
+    def add(self, sequence):
+        node = self.root
+        for depth, (gesture, timeout) in enumerate(zip(sequence.steps, sequence.timeouts)):
+            if node.sequence is not None:
+                print(f"Sequence '{sequence.name}' starts with all of '{node.sequence.name}', "
+                      f"which fires first; '{sequence.name}' can never complete.")
+            if depth > 0 and node.timeout is not None:
+                node.timeout = None if timeout is None else max(node.timeout, timeout)
+            node = node.children.setdefault(gesture, Node())
+            if depth == 0 and node.message is None:
+                node.message = sequence.message
+        if node.sequence is not None:
+            print(f"Sequences '{node.sequence.name}' and '{sequence.name}' have the same steps; "
+                  f"keeping '{node.sequence.name}'.")
+            return
+        if node.children:
+            print(f"Sequence '{sequence.name}' is the start of a longer sequence, which can never complete.")
+        node.sequence = sequence
+        if sequence.anytime and len(sequence.steps) == 1:
+            self.anytime[sequence.steps[0]] = node
+        self.sequences.append(sequence)
+
+class SequenceAutomaton:
+    """Match a stream of per-frame gestures against every sequence of the current layer.
+
+    The state is one trie node, so a frame costs a dict lookup however many
+    sequences are configured, and all sequences sharing the steps made so
+    far stay candidates. Gestures that continue no candidate are ignored
+    (held or misdetected gestures between steps). Reaching a sequence's last
+    step fires it and returns to the layer's root. Each step must come
+    within its timeout of the previous one.
+
+    `advance` and `check_timeout` return effects for the caller to apply:
+    ('message', text), ('action', name) and ('cooldown', seconds).
+    """
+
+    def __init__(self, layers, start=MAIN_LAYER):
+        self.layers = layers
+        self.start = start
+        self.completed = 0
+        self.timeouts = 0
+        self.reset()
+
+    def reset(self):
+        self.layer = self.layers[self.start]
+        self.node = self.layer.root
+        self.since = 0.0
+
+    @property
+    def in_progress(self):
+        return self.node is not self.layer.root
+
+    def check_timeout(self, now):
+        node = self.node
+        if node is self.layer.root or node.timeout is None or now - self.since <= node.timeout:
+            return NO_EFFECTS
+        self.node = self.layer.root
+        self.timeouts += 1
+        return (('message', TIMEOUT_MESSAGE),)
+
+    def advance(self, gesture, now):
+        node = self.node.children.get(gesture)
+        if node is None:
+            anytime = self.layer.anytime.get(gesture)
+            if anytime is None:
+                return NO_EFFECTS
+            # Fires without disturbing the sequence in progress
+            return self._complete(anytime.sequence, keep_node=True)
+        effects = []
+        if node.message is not None:
+            effects.append(('message', node.message))
+        self.node = node
+        self.since = now
+        if node.sequence is not None:
+            effects.extend(self._complete(node.sequence))
+        return effects
+
+    def _complete(self, sequence, keep_node=False):
+        self.completed += 1
+        effects = []
+        if sequence.action is not None:
+            effects.append(('action', sequence.action))
+        if sequence.done_message is not None:
+            effects.append(('message', sequence.done_message))
+        if sequence.cooldown:
+            effects.append(('cooldown', sequence.cooldown))
+        if sequence.enter is not None:
+            self.layer = self.layers[sequence.enter]
+        elif sequence.exit:
+            self.layer = self.layers[self.start]
+        elif keep_node:
+            return effects
+        self.node = self.layer.root
+        return effects
+
+def _parse_steps(steps, default_timeout, gesture_ids):
+    """Gesture ids and per-step timeouts; repeated consecutive gestures count as one step"""
+    ids, timeouts = [], []
+    for step in steps:
+        name, timeout = (step.get('gesture'), step.get('timeout', default_timeout)) \
+            if isinstance(step, dict) else (step, default_timeout)
+        if name not in gesture_ids:
+            raise KeyError(name)
+        gesture = gesture_ids[name]
+        if ids and ids[-1] == gesture:
+            continue
+        ids.append(gesture)
+        timeouts.append(timeout)
+    return ids, timeouts
+
+def _compile_layer(name, config, gesture_ids, layer_names, actions=None):
+    layer = Layer(name)
+    default_timeout = config.get('timeout', 5)
+    for index, entry in enumerate(config.get('sequences', [])):
+        seq_name = entry.get('name') or entry.get('action') or f"{name}[{index}]"
+        try:
+            steps, timeouts = _parse_steps(entry.get('steps', []), default_timeout, gesture_ids)
+        except KeyError as e:
+            print(f"Sequence '{seq_name}' uses gesture {e} that is not mapped in this mode; skipping it.")
+            continue
+        if not steps:
+            print(f"Sequence '{seq_name}' has no steps; skipping it.")
+            continue
+        enter = entry.get('enter')
+        if enter is not None and enter not in layer_names:
+            print(f"Sequence '{seq_name}' enters unknown layer '{enter}'; skipping it.")
+            continue
+        action = entry.get('action')
+        if action is not None and actions is not None and action not in actions:
+            print(f"Sequence '{seq_name}' uses unknown action '{action}'; skipping it.")
+            continue
+        layer.add(Sequence(seq_name, steps, timeouts, action=action,
+                           message=entry.get('message'), done_message=entry.get('done_message'),
+                           enter=enter, exit=bool(entry.get('exit', False)),
+                           cooldown=float(entry.get('cooldown', 0)), anytime=bool(entry.get('anytime', False))))
+    return layer
+
+def compile_sequences(config, gestures, actions=None):
+    """Build a SequenceAutomaton from a mode's "SEQUENCES" section of config.json.
+
+    `config` holds "sequences" (the main layer), an optional default
+    "timeout" per step and optional "layers" ({name: {"timeout", "sequences"}});
+    `gestures` maps class ids to gesture names, as in the mode's section of
+    config.json. With `actions` (valid action names), sequences with an
+    unknown action are rejected here instead of failing when they fire.
+    """
+    gesture_ids = {name: gesture for gesture, name in gestures.items()}
+    layer_configs = dict(config.get('layers', {}))
+    layer_configs[MAIN_LAYER] = {'timeout': config.get('timeout', 5), 'sequences': config.get('sequences', [])}
+    layers = {name: _compile_layer(name, layer_config, gesture_ids, layer_configs, actions)
+              for name, layer_config in layer_configs.items()}
+    return SequenceAutomaton(layers)
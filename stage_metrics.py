@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+
+METRICS_FILE_PATH = 'stage_metrics.json'
+
+# Stages of the recognition loop, from the camera to the OS action and the preview
+STAGES = (
+    'capture_wait',
+    'color_conversion',
+    'hands_process',
+    'feature_extraction',
+    'classification',
+    'sequence_matching',
+    'action_dispatch',
+    'rendering',
+)
+PERCENTILES = (50, 95, 99)
+
+class RollingWindow:
+    """The last `size` durations of one stage, in a ring, plus running totals"""
+
+    __slots__ = ('samples', 'size', 'index', 'count', 'total')
+
+    def __init__(self, size=1024):
+        self.samples = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        index = self.index
+        self.samples[index] = seconds
+        self.index = index + 1 if index + 1 < self.size else 0
+        self.count += 1
+        self.total += seconds
+
+    def percentiles(self):
+        """{percentile: seconds} over the window, or None before the first sample"""
+        n = min(self.count, self.size)
+        if not n:
+            return None
+        ordered = sorted(self.samples[:n])
+        return {p: ordered[min(n - 1, p * n // 100)] for p in PERCENTILES}
+
+class StageMetrics:
+    """Rolling latency percentiles per stage of the recognition loop.
+
+    Stages call `since(stage, started)` with a `time.perf_counter()` taken
+    when the stage began, or `add(stage, seconds)`. Recording is one ring
+    write, safe from the pipeline threads (each stage has its own window);
+    the percentiles are only computed by `summary()`, normally every few
+    seconds by the MetricsExporter. The cost of one recording is measured
+    at startup to report the instrumentation overhead.
+    """
+
+    def __init__(self, window=1024, stages=STAGES):
+        self.windows = {stage: RollingWindow(window) for stage in stages}
+        self.started = time.perf_counter()
+        self.record_cost = self._measure_record_cost()
+        # Last summary, drawn by the preview overlay
+        self.latest = {}
+
+    def add(self, stage, seconds):
+        self.windows[stage].add(seconds)
+
+    def since(self, stage, started):
+        self.windows[stage].add(time.perf_counter() - started)
+
+    @staticmethod
+    def _measure_record_cost(repeats=2000):
+        windows = {'scratch': RollingWindow(64)}
+        start = time.perf_counter()
+        for _ in range(repeats):
+            started = time.perf_counter()
+            windows['scratch'].add(time.perf_counter() - started)
+        return (time.perf_counter() - start) / repeats
+
+    def overhead(self):
+        """Estimated share of the elapsed time spent recording, summed over all threads"""
+        records = sum(window.count for window in self.windows.values())
+        elapsed = time.perf_counter() - self.started
+        return records * self.record_cost / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        stages = {}
+        for stage, window in self.windows.items():
+            percentiles = window.percentiles()
+            if percentiles is None:
+                continue
+            entry = {f'p{p}_ms': round(value * 1000, 3) for p, value in percentiles.items()}
+            entry['count'] = window.count
+            entry['mean_ms'] = round(window.total / window.count * 1000, 3)
+            stages[stage] = entry
+        self.latest = {
+            'time': time.time(),
+            'stages': stages,
+            'overhead_pct': round(self.overhead() * 100, 4),
+        }
+        return self.latest
+
+def to_prometheus(summary):
+    """Prometheus text exposition format of a summary (one summary metric, labelled by stage)"""
+    lines = [
+        '# HELP gesture_stage_latency_seconds Rolling latency of a stage of the recognition loop',
+        '# TYPE gesture_stage_latency_seconds summary',
+    ]
+    for stage, entry in summary['stages'].items():
+        for p in PERCENTILES:
+            lines.append(f'gesture_stage_latency_seconds{{stage="{stage}",quantile="{p / 100}"}} '
+                         f'{entry[f"p{p}_ms"] / 1000:.6f}')
+        lines.append(f'gesture_stage_latency_seconds_sum{{stage="{stage}"}} '
+                     f'{entry["mean_ms"] * entry["count"] / 1000:.6f}')
+        lines.append(f'gesture_stage_latency_seconds_count{{stage="{stage}"}} {entry["count"]}')
+    lines.append('# HELP gesture_instrumentation_overhead_ratio Estimated share of time spent in the timers')
+    lines.append('# TYPE gesture_instrumentation_overhead_ratio gauge')
+    lines.append(f'gesture_instrumentation_overhead_ratio {summary["overhead_pct"] / 100:.6f}')
+    return '\n'.join(lines) + '\n'
+
+class MetricsExporter:
+    """Write the StageMetrics summary to a file every `interval` seconds from a background thread.
+
+    `format` is "json" or "prometheus" (text exposition format, e.g. for
+    node_exporter's textfile collector). The file is replaced atomically.
+    """
+
+    def __init__(self, metrics, path=METRICS_FILE_PATH, interval=5.0, format='json'):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.format = format
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self):
+        summary = self.metrics.summary()
+        text = to_prometheus(summary) if self.format == 'prometheus' else json.dumps(summary, indent=4)
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not write '{self.path}': {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='MetricsExporter', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
@@ -0,0 +1,134 @@
+# "before" imports what main.py imported at top level before the lazy imports
+# (re-run by every spawned child). With --before REV those are the modules of
+# that git revision, checked out in a temporary worktree; without it they are
+# the current modules imported eagerly, only an approximation since they now
+# defer their heavy dependencies.
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+# Nothing else from the repo: a spawned child re-imports this file before it measures
+from process_stats import print_startup_stats, startup_stats
+
+# main.py's top-level imports before the change, loaded by every process
+EAGER_IMPORTS = ['message', 'gui_mode', 'systerm_control_by_handgesture']
+
+# Modules loaded by each action backend when it is created (make_backend)
+BACKEND_IMPORTS = {
+    'windows': ['win32api', 'win32con', 'win32gui'],
+    'pyautogui': ['pyautogui'],
+    'recording': [],
+}
+
+def action_backend_name():
+    """The backend make_backend picks for "action_backend" in config.json"""
+    try:
+        with open('config.json', 'r') as f:
+            name = json.load(f).get('RUNTIME', {}).get('action_backend', 'auto')
+    except Exception:
+        name = 'auto'
+    if name == 'auto':
+        return 'windows' if sys.platform == 'win32' else 'pyautogui'
+    return name
+
+def control_imports():
+    """What the gesture process imports: its module, then the modules loaded on first use"""
+    from gesture_inference import fused_model_is_current
+    modules = ['process_stats', 'systerm_control_by_handgesture',
+               # CaptureSession.configure
+               'mediapipe']
+    # The action backend, created by system_control
+    modules += BACKEND_IMPORTS.get(action_backend_name(), [])
+    if not fused_model_is_current():
+        # The first load_layers exports it from the .h5 + .pkl pair
+        modules += ['joblib', 'h5py']
+    return modules
+
+def lazy_imports():
+    """What each process imports now (see the run_* targets in main.py), including
+    the modules that are only imported once they are needed"""
+    return {
+        'main': ['process_stats', 'message_bus', 'supervisor'],
+        'message': ['process_stats', 'message'],
+        'gui_mode': ['process_stats', 'gui_mode'],
+        'system_control': control_imports(),
+    }
+
+def _measure(name, modules, results, root):
+    if root is not None:
+        # The revision's modules shadow the current ones; relative paths (model, config) resolve there
+        os.chdir(root)
+        sys.path.insert(0, root)
+    start = time.perf_counter()
+    for module in modules:
+        try:
+            __import__(module)
+        except Exception as e:
+            # e.g. win32/pystray are missing on Linux; report what could be loaded
+            print(f"  ({name}: could not import '{module}': {e.__class__.__name__})")
+    results.put(startup_stats(name, time.perf_counter() - start))
+
+def measure(name, modules, root=None):
+    """Import `modules` (from the checkout at `root`) in a fresh spawned process, as multiprocessing does on Windows"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(name, modules, results, root))
+    process.start()
+    stats = results.get()
+    process.join()
+    return stats
+
+@contextlib.contextmanager
+def worktree(revision):
+    """A temporary git worktree with `revision` checked out"""
+    path = tempfile.mkdtemp(prefix='startup_report_')
+    subprocess.run(['git', 'worktree', 'add', '--detach', path, revision],
+                   check=True, capture_output=True, text=True)
+    try:
+        yield path
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', path], capture_output=True)
+        shutil.rmtree(path, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-process import time and memory before and after the lazy imports.")
+    parser.add_argument('--before', metavar='REV',
+                        help="git revision to measure as 'before' (e.g. the commit before the lazy imports); "
+                        "without it the current modules are imported eagerly, an approximation")
+    args = parser.parse_args()
+    lazy = lazy_imports()
+
+    if args.before:
+        print(f"--- before: every process imports everything, modules of {args.before} ---")
+        try:
+            with worktree(args.before) as root:
+                before = [measure(name, EAGER_IMPORTS, root) for name in lazy]
+        except subprocess.CalledProcessError as e:
+            print(f"Error: could not check out '{args.before}': {e.stderr.strip()}")
+            return 1
+    else:
+        print("--- before (approximate: current modules imported eagerly; use --before REV) ---")
+        before = [measure(name, EAGER_IMPORTS) for name in lazy]
+    for stats in before:
+        print_startup_stats(stats)
+
+    print("\n--- after: lazy, per-process imports ---")
+    after = [measure(name, modules) for name, modules in lazy.items()]
+    for stats in after:
+        print_startup_stats(stats)
+
+    print(f"\n{'process':<16}{'import s before':>16}{'after':>8}{'RSS MB before':>15}{'after':>8}")
+    for old, new in zip(before, after):
+        rss_old = f"{old['rss_mb']:.0f}" if old['rss_mb'] is not None else 'n/a'
+        rss_new = f"{new['rss_mb']:.0f}" if new['rss_mb'] is not None else 'n/a'
+        print(f"{new['process']:<16}{old['import_s']:>16.2f}{new['import_s']:>8.2f}{rss_old:>15}{rss_new:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
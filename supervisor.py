@@ -0,0 +1,195 @@
+import json
+import time
+from multiprocessing import Process
+from message_bus import HEARTBEAT
+
+STATS_FILE_PATH = 'supervisor_stats.json'
+
+class Backoff:
+    """Delay before the next restart: none for the first failure, then doubling up to `maximum`.
+
+    The count starts over once a failure comes more than `reset_after`
+    seconds after the previous one.
+    """
+
+    def __init__(self, initial=0.5, maximum=30.0, reset_after=60.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.reset_after = reset_after
+        self.failures = 0
+        self._last_failure = None
+
+    def next(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last_failure is not None and now - self._last_failure > self.reset_after:
+            self.failures = 0
+        delay = 0.0 if self.failures == 0 else min(self.initial * 2 ** (self.failures - 1), self.maximum)
+        self.failures += 1
+        self._last_failure = now
+        return delay
+
+class RestartStats:
+    """Restart count and downtime (from failure to working again) of one worker"""
+
+    def __init__(self):
+        self.restarts = 0
+        self.downtime = 0.0
+        self.last_downtime = None
+        self._down_since = None
+
+    @property
+    def down(self):
+        return self._down_since is not None
+
+    def failed(self, now=None):
+        if self._down_since is None:
+            self._down_since = time.monotonic() if now is None else now
+
+    def recovered(self, now=None):
+        """Close the current outage; returns its length in seconds, or None if there was none"""
+        if self._down_since is None:
+            return None
+        now = time.monotonic() if now is None else now
+        self.last_downtime = now - self._down_since
+        self.downtime += self.last_downtime
+        self.restarts += 1
+        self._down_since = None
+        return self.last_downtime
+
+    def as_dict(self):
+        return {'restarts': self.restarts, 'downtime_s': round(self.downtime, 3),
+                'last_downtime_s': None if self.last_downtime is None else round(self.last_downtime, 3)}
+
+class Heartbeat:
+    """Tell the supervisor that a worker is alive, at most once every `interval` seconds"""
+
+    def __init__(self, endpoint, name, interval=1.0):
+        self.endpoint = endpoint
+        self.name = name
+        self.interval = interval
+        self._last = 0.0
+
+    def beat(self):
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.endpoint.publish(HEARTBEAT, self.name)
+
+class Worker:
+    def __init__(self, name, target, args, heartbeats):
+        self.name = name
+        self.target = target
+        self.args = args
+        # Only workers that send heartbeats can be declared hung
+        self.heartbeats = heartbeats
+        self.process = None
+        self.started = None
+        self.last_heartbeat = None
+        self.restart_at = None
+        self.backoff = Backoff()
+        self.stats = RestartStats()
+
+class Supervisor:
+    """Start the worker processes and restart the ones that crash or stop sending heartbeats.
+
+    A worker that exits with code 0 stopped on purpose and is left alone. A
+    non-zero exit code, or no heartbeat for `heartbeat_timeout` seconds
+    (`startup_timeout` before the first one), counts as a failure: the
+    worker is restarted after its Backoff delay. Downtime runs from the
+    failure until the restarted worker's first heartbeat (or its start,
+    for workers without heartbeats). Restart counts and downtime are
+    printed and written to supervisor_stats.json. `on_restart(name)` is
+    called before a failed worker is started again (main.py gives it a
+    fresh message bus inbox there).
+    """
+
+    def __init__(self, heartbeat_timeout=10.0, startup_timeout=60.0, on_restart=None):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout
+        self.on_restart = on_restart
+        self.workers = {}
+
+    def add(self, name, target, args=(), heartbeats=False):
+        self.workers[name] = Worker(name, target, args, heartbeats)
+
+    @property
+    def processes(self):
+        return [worker.process for worker in self.workers.values() if worker.process is not None]
+
+    def start(self):
+        for worker in self.workers.values():
+            self._start(worker)
+
+    def _start(self, worker):
+        worker.process = Process(target=worker.target, args=worker.args, name=worker.name)
+        worker.process.start()
+        worker.started = time.monotonic()
+        worker.last_heartbeat = None
+        worker.restart_at = None
+        if not worker.heartbeats:
+            self._recovered(worker)
+
+    def heartbeat(self, name):
+        worker = self.workers.get(name)
+        if worker is None:
+            return
+        worker.last_heartbeat = time.monotonic()
+        self._recovered(worker)
+
+    def _recovered(self, worker):
+        downtime = worker.stats.recovered()
+        if downtime is not None:
+            print(f"Supervisor: '{worker.name}' is back after {downtime * 1000:.0f} ms "
+                  f"(restart #{worker.stats.restarts}).")
+            self.write_stats()
+
+    def check(self):
+        """Restart failed workers whose backoff delay has passed; call regularly"""
+        now = time.monotonic()
+        for worker in self.workers.values():
+            if worker.restart_at is not None:
+                if now >= worker.restart_at:
+                    if self.on_restart is not None:
+                        self.on_restart(worker.name)
+                    self._start(worker)
+                continue
+            process = worker.process
+            if process.is_alive():
+                if worker.heartbeats and self._hung(worker, now):
+                    print(f"Supervisor: no heartbeat from '{worker.name}', terminating it.")
+                    process.terminate()
+                    process.join(1.0)
+                    self._failed(worker, now)
+            elif process.exitcode != 0 and process.exitcode is not None:
+                print(f"Supervisor: '{worker.name}' exited with code {process.exitcode}.")
+                self._failed(worker, now)
+
+    def _hung(self, worker, now):
+        if worker.last_heartbeat is None:
+            return now - worker.started > self.startup_timeout
+        return now - worker.last_heartbeat > self.heartbeat_timeout
+
+    def _failed(self, worker, now):
+        worker.stats.failed(now)
+        delay = worker.backoff.next(now)
+        worker.restart_at = now + delay
+        print(f"Supervisor: restarting '{worker.name}' in {delay:.1f} s.")
+
+    def stats(self):
+        return {name: worker.stats.as_dict() for name, worker in self.workers.items()}
+
+    def write_stats(self, path=STATS_FILE_PATH):
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats(), f, indent=4)
+        except IOError as e:
+            print(f"Could not write '{path}': {e}")
+
+    def stop(self, grace=3.0):
+        """Give the workers `grace` seconds to exit on their own, then terminate the rest"""
+        deadline = time.monotonic() + grace
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        print(f"Supervisor: {self.stats()}")
@@ -1,516 +1,1018 @@
-import subprocess
+import threading
+import traceback
 import cv2
-import mediapipe as mp
 import numpy as np
-import pyautogui
-import tensorflow as tf
-from tensorflow.keras.models import load_model # type: ignore
-import win32api
-import win32con
 import time
 import os  
-import joblib
-import win32gui  
 import json
-from message import send_message_to_file
+from types import SimpleNamespace
+try:
+    import win32api
+    import win32con
+    import win32gui
+except ImportError:
+    # Not on Windows: replays and headless runs still work, OS actions and window styling do not
+    win32api = win32con = win32gui = None
+import message_bus
+from message import send_message
+from gesture_inference import BACKENDS, FUSED_MODEL_PATH, load_gesture_model, model_files_signature
+from landmark_utils import LandmarkBuffer, hand_bounding_box, map_landmarks_to_frame
+from prediction_cache import PredictionCache
+from frame_sources import FramePool, FramePreprocessor, open_camera
+from pipeline import Pipeline
+from overlay import draw_gesture_text, draw_stage_metrics, make_renderer
+from config_watcher import ConfigWatcher
+from supervisor import Backoff, Heartbeat, RestartStats
+from action_dispatcher import ActionDispatcher
+from action_backends import ACTION_NAMES, backend_actions, make_backend
+from sequence_engine import compile_sequences
+from idle_governor import IdleGovernor
+from stage_metrics import MetricsExporter, StageMetrics
+from profiler import PROFILE_DIR, REQUEST_FILE_PATH, ProfileSwitch
 
 MODEL_PATH = 'gesture_recognition_model.h5'
 SCALER_PATH = 'scaler.pkl' 
 
-# region load the trained model and scaler
-if not os.path.exists(MODEL_PATH) or not os.path.exists(SCALER_PATH):
-    print(f"Error: Model file ('{MODEL_PATH}') or scaler ('{SCALER_PATH}') not found.")
-    print("Please run 'train_model.py' first to train and save them.")
-    exit()
-try:
-    model = tf.keras.models.load_model(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-    print(f"Successfully loaded model from '{MODEL_PATH}' and scaler from '{SCALER_PATH}'.")
-except Exception as e:
-    print(f"Error loading model or scaler: {e}")
-    print("Please check file paths and formats.")
-    exit()
+def get_runtime_config():
+    """Read the "RUNTIME" section of config.json (classifier backend, ...)"""
+    try:
+        with open('config.json', 'r') as f:
+            return json.load(f).get('RUNTIME', {})
+    except Exception:
+        return {}
+
+# region load the trained model (scaler is folded into the first layer)
+model = None
+loaded_from = None
+model_signature = None
+
+def load_model():
+    """(Re)load the classifier for the backend set in config.json"""
+    global model, loaded_from, model_signature
+    # "backend" in config.json: "float" (default), "int8" or "float16"
+    backend = get_runtime_config().get('backend', 'float')
+    if backend not in BACKENDS:
+        print(f"Unknown backend '{backend}' in config.json, using 'float'.")
+        backend = 'float'
+    model, loaded_from = load_gesture_model(FUSED_MODEL_PATH, MODEL_PATH, SCALER_PATH, backend)
+    model_signature = (model_files_signature(FUSED_MODEL_PATH, MODEL_PATH, SCALER_PATH), backend)
+    print(f"Successfully loaded model from '{loaded_from}' ({backend} backend).")
+
+def reload_model_if_changed():
+    """Reload the model after retraining or a backend change in config.json"""
+    backend = get_runtime_config().get('backend', 'float')
+    try:
+        if model_signature != (model_files_signature(FUSED_MODEL_PATH, MODEL_PATH, SCALER_PATH), backend):
+            load_model()
+            if motion_gate is not None:
+                motion_gate.reset()
+    except Exception as e:
+        print(f"Error reloading model, keeping the current one: {e}")
+
+def init_model():
+    """Load the model when the inference process starts (not at import time)"""
+    if not os.path.exists(FUSED_MODEL_PATH) and (not os.path.exists(MODEL_PATH) or not os.path.exists(SCALER_PATH)):
+        print(f"Error: Model file ('{FUSED_MODEL_PATH}' or '{MODEL_PATH}' + '{SCALER_PATH}') not found.")
+        print("Please run 'train_model.py' first to train and save them.")
+        return False
+    try:
+        load_model()
+    except Exception as e:
+        print(f"Error loading model or scaler: {e}")
+        print("Please check file paths and formats.")
+        return False
+    return True
 # endregion
 
 # Define gesture mappings
 GESTURES = {}
 
+# Time source of the control loop; replays swap in the recording's timestamps
+clock = time.time
+
+# Reused every frame to hold the model input (one row per hand)
+landmark_buffer = LandmarkBuffer(max_hands=2)
+
+# LRU cache in front of the classifier ("cache" in the "RUNTIME" section of config.json)
+_cache_config = get_runtime_config().get('cache', {})
+prediction_cache = PredictionCache(
+    grid_size=float(_cache_config.get('grid_size', 0.01)),
+    capacity=int(_cache_config.get('capacity', 256))) if _cache_config.get('enabled', True) else None
+
 def ensure_mode_config():
     if not os.path.exists('mode_config.json') or os.path.getsize('mode_config.json') == 0:
         with open('mode_config.json', 'w', encoding='utf-8') as f:
             json.dump({"current_mode": "VIDEO"}, f, ensure_ascii=False, indent=4)
 
-def focus_powerpoint_slideshow():
-    def enum_handler(hwnd, result):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd)
-            if "PowerPoint Slide Show" in title:
-                result.append(hwnd)
-    result = []
-    win32gui.EnumWindows(enum_handler, result)
-    if result:
-        win32gui.SetForegroundWindow(result[0])
-        return True
-    return False
+def get_max_num_hands(mode):
+    """Number of hands tracked in a mode ("max_num_hands" in the "RUNTIME" section of config.json)"""
+    return int(get_runtime_config().get('max_num_hands', {}).get(mode, 1))
 
 def get_gesture_mappings(class_name):
     import json
     with open('config.json', 'r') as f:
         config = json.load(f)
-        mapping = config.get(class_name)
-        if mapping is not None:
-            # Convert key from str to int
-            return {int(k): v for k, v in mapping.items()}
-        return {}
+        return mappings_from_config(config, class_name)
 
-def send_play_pause():
-    """Simulate media play/pause key press"""
-    win32api.keybd_event(win32con.VK_MEDIA_PLAY_PAUSE, 0, 0, 0)
-    win32api.keybd_event(win32con.VK_MEDIA_PLAY_PAUSE, 0, win32con.KEYEVENTF_KEYUP, 0)
+def mappings_from_config(config, class_name):
+    mapping = config.get(class_name)
+    if mapping is not None:
+        # Convert key from str to int
+        return {int(k): v for k, v in mapping.items()}
+    return {}
+
+def get_sequence_config(class_name):
+    with open('config.json', 'r') as f:
+        return sequences_from_config(json.load(f), class_name)
+
+def sequences_from_config(config, class_name):
+    """The mode's gesture sequences ("SEQUENCES" in config.json), compiled by sequence_engine"""
+    sequences = config.get('SEQUENCES', {}).get(class_name)
+    if sequences is None:
+        print(f"No gesture sequences configured for {class_name} in config.json.")
+        return {}
+    return sequences
+
+# OS actions go through a backend ("action_backend" in the "RUNTIME" section of config.json:
+# "auto", "windows", "pyautogui" or "recording"); created on first use or by system_control
+action_backend = None
+# Actions triggered by the gesture sequences, by name
+ACTIONS = {}
+
+def set_action_backend(backend):
+    global action_backend, ACTIONS
+    action_backend = backend
+    ACTIONS = backend_actions(backend)
+
+# Shown in the overlay when an action could not be carried out
+ACTION_FAILURE_MESSAGES = {
+    'next_slide': "Could not find PowerPoint Slide Show window!",
+    'previous_slide': "Could not find PowerPoint Slide Show window!",
+}
+
+def perform_action(name):
+    """Run the named action; returns False if it could not be carried out"""
+    if action_backend is None:
+        set_action_backend(make_backend(get_runtime_config().get('action_backend', 'auto')))
+    return ACTIONS[name]() is not False
+
+def report_failed_action(name):
+    send_message(ACTION_FAILURE_MESSAGES.get(name, f"Action '{name}' failed!"))
+
+# Runs the actions off the frame loop; created by system_control
+dispatcher = None
+
+def dispatch_action(name):
+    """Hand the action to the dispatcher (or run it right away when there is none); False if debounced"""
+    if dispatcher is None:
+        if not perform_action(name):
+            report_failed_action(name)
+        return True
+    return dispatcher.submit(name)
+
+class MotionGate:
+    """Reuse the last prediction while the hands stay still.
+
+    The landmarks are compared with those of the last classified frame; when
+    the mean landmark displacement of every hand stays below `threshold`
+    (normalized units), the previous result is returned. A fresh
+    classification is forced after `max_interval` seconds or when the number
+    of hands changes.
+    """
+
+    def __init__(self, threshold=0.01, max_interval=0.5):
+        self.threshold = threshold
+        self.max_interval = max_interval
+        self.last_rows = np.zeros((0, 0), dtype=np.float32)
+        self.last_result = None
+        self.last_time = 0.0
+        self.frames = 0
+        self.classified = 0
+
+    def reset(self):
+        self.last_result = None
+
+    def lookup(self, rows, now):
+        """Return the previous (classes, confidences) if the hands did not move, else None"""
+        self.frames += 1
+        if (self.last_result is None or rows.shape != self.last_rows.shape
+                or now - self.last_time >= self.max_interval):
+            return None
+        displacement = np.linalg.norm((rows - self.last_rows).reshape(len(rows), -1, 3), axis=2).mean(axis=1)
+        if displacement.max() >= self.threshold:
+            return None
+        return self.last_result
+
+    def update(self, rows, result, now):
+        if rows.shape != self.last_rows.shape:
+            self.last_rows = np.empty_like(rows)
+        np.copyto(self.last_rows, rows)
+        self.last_result = result
+        self.last_time = now
+        self.classified += 1
+
+class RateReporter:
+    """Print the camera frame rate next to the effective classification rate"""
+
+    def __init__(self, gate, interval=10.0, capture=None, governor=None):
+        self.gate = gate
+        self.interval = interval
+        self.capture = capture
+        self.governor = governor
+        self._start = clock()
+        self._camera_frames = 0
+        self._gate_frames = 0
+        self._gate_classified = 0
+
+    def tick(self, now):
+        self._camera_frames += 1
+        elapsed = now - self._start
+        if elapsed < self.interval:
+            return
+        camera_fps = self._camera_frames / elapsed
+        if self.gate is not None:
+            hand_frames = self.gate.frames - self._gate_frames
+            classified = self.gate.classified - self._gate_classified
+            skipped = 100.0 * (1 - classified / hand_frames) if hand_frames else 0.0
+            print(f"Camera: {camera_fps:.1f} fps, classifier: {classified / elapsed:.1f}/s "
+                  f"({skipped:.0f}% of hand frames reused the last prediction)")
+            self._gate_frames = self.gate.frames
+            self._gate_classified = self.gate.classified
+        else:
+            print(f"Camera: {camera_fps:.1f} fps")
+        if getattr(self.capture, 'dropped', None) is not None:
+            print(f"Capture: {self.capture.dropped} stale frames dropped so far")
+        if self.governor is not None:
+            print(self.governor.summary())
+        self._start = now
+        self._camera_frames = 0
+
+# Skip classification while the hands are still ("motion_gate" in the "RUNTIME" section of config.json)
+_gate_config = get_runtime_config().get('motion_gate', {})
+motion_gate = MotionGate(
+    threshold=float(_gate_config.get('threshold', 0.01)),
+    max_interval=float(_gate_config.get('max_interval', 0.5))) if _gate_config.get('enabled', True) else None
+RATE_REPORT_INTERVAL = float(get_runtime_config().get('rate_report_interval', 10))
+# Read the camera on a background thread and always process the newest frame
+THREADED_CAPTURE = bool(get_runtime_config().get('threaded_capture', True))
+# Run capture / landmarks / classification / actions as a threaded pipeline
+PIPELINE_CONFIG = get_runtime_config().get('pipeline', {})
+# What MediaPipe sees: the full frame, a downscaled frame or a crop around the hand
+DETECTION_INPUT_CONFIG = get_runtime_config().get('detection_input', {})
+
+# Preview window: "enabled": false runs headless; "renderer" is "mediapipe" or "fast"
+PREVIEW_CONFIG = get_runtime_config().get('preview', {})
+# How often the config watcher checks mode_config.json and config.json for changes (seconds)
+CONFIG_WATCH_INTERVAL = float(get_runtime_config().get('config_watch_interval', 0.2))
+# Lower detection rate (and optionally camera resolution) while no hand is in view
+IDLE_CONFIG = get_runtime_config().get('idle', {})
+# Results of a frame whose hand detection was skipped by the idle governor
+NO_HANDS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+# Per-stage latency percentiles, exported to a file and optionally drawn on the preview
+METRICS_CONFIG = get_runtime_config().get('metrics', {})
+metrics = StageMetrics(int(METRICS_CONFIG.get('window', 1024))) if METRICS_CONFIG.get('enabled', True) else None
+METRICS_OVERLAY = metrics is not None and bool(METRICS_CONFIG.get('overlay', False))
+# On-demand sampling profiler (GESTURE_PROFILE or `python profiler.py --seconds N`)
+PROFILING_CONFIG = get_runtime_config().get('profiling', {})
 
 def predict_gesture(landmarks):
     """Convert landmarks to model input and predict gesture"""
+    predicted_classes, _ = predict_gestures([landmarks])
+    return predicted_classes[0]
+
+def predict_gestures(multi_hand_landmarks):
+    """Predict the gestures of all hands in a frame with one forward pass.
+
+    The motion gate reuses the last result while the hands are still, and
+    hands found in the prediction cache skip the model. Returns
+    (classes, confidences), one entry per hand.
+    """
     # Flatten landmarks to match training data format
-    row = []
-    for landmark in landmarks.landmark:
-        row.extend([landmark.x, landmark.y, landmark.z])
-    
-    # Scale the features
-    scaled_row = scaler.transform([row])
-    
-    # Predict
-    prediction = model.predict(scaled_row)
-    predicted_class = np.argmax(prediction[0])
-    
-    return predicted_class
-
-def control_video():
-    # region initialize MediaPipe
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        max_num_hands=1,
-        min_detection_confidence=0.8,
-        min_tracking_confidence=0.9)
-    mp_draw = mp.solutions.drawing_utils
-    #endregion
+    started = time.perf_counter()
+    rows = landmark_buffer.fill(multi_hand_landmarks)
+    if metrics is not None:
+        metrics.since('feature_extraction', started)
+        started = time.perf_counter()
+    if motion_gate is not None:
+        now = clock()
+        result = motion_gate.lookup(rows, now)
+        if result is None:
+            result = _classify(rows)
+            motion_gate.update(rows, result, now)
+    else:
+        result = _classify(rows)
+    if metrics is not None:
+        metrics.since('classification', started)
+    return result
+
+def _classify(rows):
+    """Run the classifier on the (n, 63) rows, going through the prediction cache if enabled"""
+    if prediction_cache is None:
+        prediction = model.predict(rows)
+        predicted_classes = np.argmax(prediction, axis=1)
+        confidences = prediction[np.arange(len(predicted_classes)), predicted_classes]
+        return predicted_classes, confidences
+
+    prediction_cache.sync(model)
+    predicted_classes = np.empty(len(rows), dtype=np.int64)
+    confidences = np.empty(len(rows), dtype=np.float32)
+    keys = [prediction_cache.key(row) for row in rows]
+    missed = []
+    for i, key in enumerate(keys):
+        entry = prediction_cache.get(key)
+        if entry is None:
+            missed.append(i)
+        else:
+            predicted_classes[i], confidences[i] = entry
+
+    if missed:
+        # Predict (the model scales the features itself)
+        prediction = model.predict(rows[missed])
+        for i, probabilities in zip(missed, prediction):
+            predicted_class = int(np.argmax(probabilities))
+            entry = (predicted_class, float(probabilities[predicted_class]))
+            prediction_cache.put(keys[i], entry)
+            predicted_classes[i], confidences[i] = entry
+    return predicted_classes, confidences
+
+class DetectionInput:
+    """Choose what MediaPipe Hands sees for each frame.
+
+    'full' passes the whole frame. 'downscale' passes the frame resized by
+    `scale`; landmarks are normalized, so they need no mapping back. 'roi'
+    passes a crop around the hands of the previous frame, enlarged by
+    `roi_margin` of the hand size (at least `min_roi_size` of the frame). The
+    crop is kept still while the hands stay well inside it, so MediaPipe can
+    keep tracking inside the crop. Landmarks are mapped back to full-frame
+    coordinates. When no hand is found in the crop, the same frame is
+    processed in full.
+    """
+
+    MODES = ('full', 'downscale', 'roi')
+
+    def __init__(self, mode='full', scale=0.5, roi_margin=0.25, min_roi_size=0.3):
+        if mode not in self.MODES:
+            print(f"Unknown detection input mode '{mode}', using 'full'.")
+            mode = 'full'
+        self.mode = mode
+        self.scale = scale
+        self.roi_margin = roi_margin
+        self.min_roi_size = min_roi_size
+        self.roi = None
+        self.fallbacks = 0
+        self._small_frame = None
+        # Flat scratch array for the contiguous ROI crop, grown to the largest crop seen
+        self._roi_scratch = None
+
+    def process(self, hands, rgb_frame):
+        if self.mode == 'downscale':
+            height, width = rgb_frame.shape[:2]
+            size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+            if self._small_frame is None or self._small_frame.shape[1::-1] != size:
+                self._small_frame = np.empty((size[1], size[0], 3), dtype=rgb_frame.dtype)
+            cv2.resize(rgb_frame, size, dst=self._small_frame, interpolation=cv2.INTER_AREA)
+            return hands.process(self._small_frame)
+        if self.mode == 'roi':
+            return self._process_roi(hands, rgb_frame)
+        return hands.process(rgb_frame)
+
+    def _process_roi(self, hands, rgb_frame):
+        height, width = rgb_frame.shape[:2]
+        if self.roi is not None:
+            results = hands.process(self._crop(rgb_frame))
+            if results.multi_hand_landmarks:
+                map_landmarks_to_frame(results.multi_hand_landmarks, self.roi, width, height)
+                self._update_roi(results.multi_hand_landmarks, width, height)
+                return results
+            # Tracking lost: look at the whole frame again
+            self.roi = None
+            self.fallbacks += 1
+        results = hands.process(rgb_frame)
+        if results.multi_hand_landmarks:
+            self._update_roi(results.multi_hand_landmarks, width, height)
+        return results
+
+    def _crop(self, rgb_frame):
+        """Copy the ROI into a contiguous view of the scratch array (MediaPipe needs contiguous input)"""
+        x0, y0, x1, y1 = self.roi
+        crop = rgb_frame[y0:y1, x0:x1]
+        if self._roi_scratch is None or self._roi_scratch.size < crop.size or self._roi_scratch.dtype != crop.dtype:
+            self._roi_scratch = np.empty(crop.size, dtype=crop.dtype)
+        scratch = self._roi_scratch[:crop.size].reshape(crop.shape)
+        np.copyto(scratch, crop)
+        return scratch
+
+    def _update_roi(self, multi_hand_landmarks, width, height):
+        x_min, y_min, x_max, y_max = hand_bounding_box(multi_hand_landmarks)
+        x_min, x_max = x_min * width, x_max * width
+        y_min, y_max = y_min * height, y_max * height
+        if self.roi is not None:
+            # Keep the crop still while the hands stay away from its edges
+            rx0, ry0, rx1, ry1 = self.roi
+            inset = 0.1 * min(rx1 - rx0, ry1 - ry0)
+            if x_min >= rx0 + inset and y_min >= ry0 + inset and x_max <= rx1 - inset and y_max <= ry1 - inset:
+                return
+        size = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_margin)
+        size = max(size, self.min_roi_size * min(width, height))
+        center_x = (x_min + x_max) / 2
+        center_y = (y_min + y_max) / 2
+        self.roi = (int(max(0, center_x - size / 2)), int(max(0, center_y - size / 2)),
+                    int(min(width, center_x + size / 2)), int(min(height, center_y + size / 2)))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(mode=config.get('mode', 'full'),
+                   scale=float(config.get('scale', 0.5)),
+                   roi_margin=float(config.get('roi_margin', 0.25)),
+                   min_roi_size=float(config.get('min_roi_size', 0.3)))
+
+class CaptureSession:
+    """Camera, MediaPipe Hands and preview window shared by every mode.
+
+    Owned by `system_control` and kept open across VIDEO/SLIDE switches, so a
+    mode switch only swaps the gesture mappings and the mode handler.
+    `capture` replaces the camera with any object that has `read()` and
+    `release()`, such as the recorded sources in frame_sources.py;
+    `preview` overrides the "preview" setting of config.json.
+    """
+
+    def __init__(self, window_name='Gesture Control', capture=None, preview=None):
+        self.window_name = window_name
+        self.hands = None
+        self.max_num_hands = None
+        self.detection_input = DetectionInput.from_config(DETECTION_INPUT_CONFIG)
+        # Camera and mirrored frames are reused once given back with recycle(), never while still in flight
+        self.frame_pool = FramePool()
+        self.preprocessor = FramePreprocessor(self.frame_pool)
+        self.pipelined = bool(PIPELINE_CONFIG.get('enabled', False))
+        # The grabber reads into the pool itself; recorded sources hand out their own arrays
+        self._read_into_pool = capture is None and not THREADED_CAPTURE
+        # Only the camera is throttled while idle; recorded sources are read as they are
+        self._paced = capture is None
+        self._frame_shape = None
+        self.window_visible = False
+        # Set when a mode switch is requested; the next processed frame reports the latency
+        self.switch_started = None
+        # Set by system_control: watched mode_config.json / config.json, and the config version in use
+        self.mode_file = None
+        self.config_file = None
+        self.config_version = None
+        # Set from another thread (message bus shutdown); the loop exits at the next frame
+        self.stop_requested = False
+        self.governor = IdleGovernor.from_config(IDLE_CONFIG)
+        self.cap = capture if capture is not None else open_camera(0, THREADED_CAPTURE, self.frame_pool)
+        # Headless: no window, no drawing, no imshow
+        self.preview = bool(PREVIEW_CONFIG.get('enabled', True)) if preview is None else preview
+        self.renderer = make_renderer(PREVIEW_CONFIG.get('renderer', 'mediapipe')) if self.preview else None
+        self.hwnd = None
+        if self.preview:
+            self._create_window()
 
     # region gui camera
-    # Initialize camera
-    cap = cv2.VideoCapture(0)
-
-    # Create and position window without title bar and shadow
-    window_name = 'Gesture Control'
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    hwnd = win32gui.FindWindow(None, window_name)
-    
-    # Remove window border, title bar, and shadow
-    style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-    style = style & ~(win32con.WS_CAPTION | win32con.WS_THICKFRAME | 
-                     win32con.WS_MINIMIZEBOX | win32con.WS_MAXIMIZEBOX | win32con.WS_SYSMENU)
-    win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
-    
-    # Remove extended window styles (including shadow)
-    ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-    ex_style = ex_style & ~(win32con.WS_EX_DLGMODALFRAME | win32con.WS_EX_CLIENTEDGE | 
-                           win32con.WS_EX_STATICEDGE | win32con.WS_EX_WINDOWEDGE)
-    win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex_style)
-    
-    # Get screen resolution
-    screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-    screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-
-    # Set window size
-    window_width = 320
-    window_height = 240
-    
-    # Calculate position (e.g., top-right corner with 20px margin)
-    pos_x = (screen_width - window_width) // 2
-    pos_y = 20
-
-    # Set window position and size
-    win32gui.SetWindowPos(hwnd, 
-                         win32con.HWND_TOPMOST,  # Changed to HWND_TOPMOST to keep window on top
-                         pos_x, pos_y,
-                         window_width, window_height,
-                         win32con.SWP_SHOWWINDOW)
-    #endregion
-
-    # region Control variables
-    window_visible = False
-    gesture_key = list(GESTURES)
-    # endregion
+    def _create_window(self):
+        # Create and position window without title bar and shadow
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        if win32gui is None:
+            return
+        # Looked up once; the window lives as long as the session
+        hwnd = self.hwnd = win32gui.FindWindow(None, self.window_name)
+        
+        # Remove window border, title bar, and shadow
+        style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+        style = style & ~(win32con.WS_CAPTION | win32con.WS_THICKFRAME | 
+                         win32con.WS_MINIMIZEBOX | win32con.WS_MAXIMIZEBOX | win32con.WS_SYSMENU)
+        win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
+        
+        # Remove extended window styles (including shadow)
+        ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        ex_style = ex_style & ~(win32con.WS_EX_DLGMODALFRAME | win32con.WS_EX_CLIENTEDGE | 
+                               win32con.WS_EX_STATICEDGE | win32con.WS_EX_WINDOWEDGE)
+        win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex_style)
+        
+        # Get screen resolution
+        screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+        screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
 
-    # region test gesture
-    queue_templates = {
-        "queue1": [gesture_key[1], gesture_key[0]], 
-        "queue2": [gesture_key[5], gesture_key[1], gesture_key[0]],  
-        "queue3": [gesture_key[4], gesture_key[1], gesture_key[0]],  
-        "queue4": [gesture_key[3], gesture_key[1], gesture_key[0]],  
-        "queue6": [gesture_key[1], gesture_key[0]]
-    }
-    current_queue_name = None
-    gesture_queue = []
-    activated = False
-    queue_start_time = None
-    timeout = 5  
-    volume_mode = False
-    last_gesture = None
-    # endregion
+        # Set window size
+        window_width = 320
+        window_height = 240
+        
+        # Calculate position (e.g., top-right corner with 20px margin)
+        pos_x = (screen_width - window_width) // 2
+        pos_y = 20
+
+        # Set window position and size
+        win32gui.SetWindowPos(hwnd, 
+                             win32con.HWND_TOPMOST,  # Changed to HWND_TOPMOST to keep window on top
+                             pos_x, pos_y,
+                             window_width, window_height,
+                             win32con.SWP_SHOWWINDOW)
+    #endregion
 
-    while True:
-        # region read frame
-        ret, frame = cap.read()
+    def configure(self, max_num_hands):
+        """Set the number of tracked hands; Hands is only rebuilt when it changes"""
+        if self.hands is not None and max_num_hands == self.max_num_hands:
+            return
+        if self.hands is not None:
+            self.hands.close()
+        import mediapipe as mp  # only needed once frames are processed (not for landmark replays)
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_num_hands,
+            min_detection_confidence=0.8,
+            min_tracking_confidence=0.9)
+        self.max_num_hands = max_num_hands
+
+    def reopen_capture(self):
+        self.cap.release()
+        self.cap = open_camera(0, THREADED_CAPTURE, self.frame_pool)
+        self._frame_shape = None
+
+    def grab(self):
+        """Capture stage: the next camera frame, or None if the camera failed"""
+        started = time.perf_counter()
+        if self.governor is not None:
+            # Resolution changes happen on the thread that reads the camera
+            self.governor.apply_resolution(self.cap)
+            if self._paced:
+                # Idle: take a frame every frame_interval instead of at the camera's rate
+                delay = self.governor.pace(self.cap, time.monotonic())
+                if delay:
+                    time.sleep(delay)
+        if self._read_into_pool:
+            # Plain VideoCapture: decode into a free array of the pool
+            ret, frame = self.frame_pool.read(self.cap, self._frame_shape)
+        else:
+            ret, frame = self.cap.read()
+        if metrics is not None:
+            metrics.since('capture_wait', started)
         if not ret:
-            break
+            return None
+        if self._read_into_pool:
+            self._frame_shape = frame.shape
+        return frame
+
+    def detect(self, frame):
+        """Landmark stage: mirror the frame and run MediaPipe Hands on it"""
+        governor = self.governor
+        if governor is not None and not governor.should_detect(frame, clock()):
+            # Idle and nothing moved: the window is hidden, so the raw frame is never shown
+            return frame, NO_HANDS
+        # Written into reused buffers, no new full-frame arrays per frame
+        started = time.perf_counter()
+        raw_frame = frame
+        frame, rgb_frame = self.preprocessor.process(raw_frame)
+        # Only the mirrored frame travels on
+        self.frame_pool.release(raw_frame)
+        if metrics is not None:
+            metrics.since('color_conversion', started)
+            started = time.perf_counter()
+        results = self.detection_input.process(self.hands, rgb_frame)
+        if metrics is not None:
+            metrics.since('hands_process', started)
+        if governor is not None:
+            governor.update(bool(results.multi_hand_landmarks), clock())
+        return frame, results
+
+    def recycle(self, frame):
+        """Give back a frame returned by `detect` once it has been acted on and shown"""
+        self.frame_pool.release(frame)
+
+    def read(self):
+        """Return (frame, results) for the next camera frame, or (None, None) if the camera failed"""
+        frame = self.grab()
+        if frame is None:
+            return None, None
+        return self.detect(frame)
+
+    @property
+    def rendering(self):
+        """True when the preview is on screen, i.e. when drawing the frame is worth it"""
+        return self.preview and self.window_visible
+
+    def set_window_visible(self, visible):
+        if not self.preview or visible == self.window_visible:
+            return
+        if self.hwnd is not None:
+            win32gui.ShowWindow(self.hwnd, win32con.SW_SHOW if visible else win32con.SW_HIDE)
+        self.window_visible = visible
+
+    def draw_landmarks(self, frame, hand_landmarks):
+        self.renderer.draw_hand(frame, hand_landmarks)
+
+    def show(self, frame):
+        """Show the frame if the preview is visible; returns the pressed key (-1 if none)"""
+        if not self.preview:
+            return -1
+        if self.window_visible:
+            cv2.imshow(self.window_name, frame)
+        # Still pump window events while hidden
+        return cv2.waitKey(1)
+
+    def requested_mode(self):
+        """Mode selected in mode_config.json, or None if it cannot be read"""
+        if self.mode_file is not None:
+            # Kept up to date by the config watcher, no file access here
+            config = self.mode_file.value
+            return config.get('current_mode', 'VIDEO') if isinstance(config, dict) else None
+        try:
+            return read_current_mode()
+        except Exception:
+            return None
+
+    def config_changed(self):
+        """True when config.json changed since the gesture mappings in use were loaded"""
+        return self.config_file is not None and self.config_file.version != self.config_version
+
+    def close(self):
+        self.cap.release()
+        if self.hands is not None:
+            self.hands.close()
+        if self.preview:
+            cv2.destroyAllWindows()
+
+class ModeHandler:
+    """Where a mode handler sends its messages and actions.
+
+    `notify` receives the overlay messages and `perform` the action names
+    (see ACTIONS); replays pass their own to record them instead. Nothing
+    here sleeps: pauses are cooldowns measured with `clock()`, during which
+    gestures are ignored while frames keep being processed.
+    """
+
+    # Minimum time between two gesture steps
+    step_interval = 0
+
+    def __init__(self, notify=None, perform=None):
+        self.notify = notify or send_message
+        self.perform = perform or dispatch_action
+        self.cooldown_until = 0.0
+
+    def start_cooldown(self, seconds):
+        self.cooldown_until = clock() + seconds
+
+    def accepts_gestures(self, now):
+        """False while cooling down; otherwise starts the next step_interval"""
+        if now < self.cooldown_until:
+            return False
+        if self.step_interval:
+            self.cooldown_until = now + self.step_interval
+        return True
 
-        # Process frame
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
-        
-        # Get window handle
-        window = win32gui.FindWindow(None, window_name)
-        # endregion
+class SequenceModeHandler(ModeHandler):
+    """Runs the gesture sequences of a mode ("SEQUENCES" in config.json) on a SequenceAutomaton"""
+
+    mode = None
+
+    def __init__(self, notify=None, perform=None, sequences=None):
+        super().__init__(notify, perform)
+        if sequences is None:
+            sequences = get_sequence_config(self.mode)
+        self.automaton = compile_sequences(sequences, GESTURES, ACTION_NAMES)
+
+    def apply(self, effects):
+        for kind, value in effects:
+            if kind == 'message':
+                self.notify(value)
+            elif kind == 'action':
+                self.perform(value)
+            elif kind == 'cooldown':
+                self.start_cooldown(value)
+
+    def check_timeout(self, now):
+        self.apply(self.automaton.check_timeout(now))
+
+    def on_no_hand(self):
+        pass
+
+    def on_gesture(self, current_gesture):
+        """Advance the gesture sequences; returns True to skip drawing the gesture name"""
+        effects = self.automaton.advance(current_gesture, clock())
+        if not effects:
+            return False
+        self.apply(effects)
+        return True
 
-        # region timeout check queue
-        # Check timeout at the beginning of the loop (if activated)
-        if activated and queue_start_time is not None:
-            if time.time() - queue_start_time > timeout:
-                # print("Time out! Canceling queue.")
-                send_message_to_file("Time out! Canceling action.")
-                gesture_queue = []
-                activated = False
-                queue_start_time = None
-                current_queue_name = None
-        # endregion
+class VideoModeHandler(SequenceModeHandler):
+    """Gesture sequences of VIDEO mode (play/pause, next/previous track, open app, volume)"""
 
-        # region when tracking hands
-        if results.multi_hand_landmarks:
-            # Show window if currently hidden
-            if not window_visible:
-                win32gui.ShowWindow(window, win32con.SW_SHOW)
-                window_visible = True
-
-            for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # region Draw landmarks and Predict gesture
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                current_gesture = predict_gesture(hand_landmarks)
-                # endregion
-
-                # region trigger gesture
-                if not volume_mode and not activated and last_gesture is None:
-                    if current_gesture == gesture_key[6]:
-                        activated = True
-                        volume_mode = True
-                        last_gesture = current_gesture
-                        current_queue_name = "queue6"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        # print("Switched to volume control mode!")
-                        send_message_to_file("Switched to volume control mode!")
-                        continue 
-                if not activated and last_gesture is None:
-                    if current_gesture == gesture_key[1]:
-                        current_queue_name = "queue1"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        # print("Activated stop/turn off video!")
-                        send_message_to_file("Activated stop/turn off video!")
-                        continue
-                    elif current_gesture == gesture_key[5]:
-                        current_queue_name = "queue2"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        # print("Activated open application!")
-                        send_message_to_file("Activated open application!")
-                        continue
-                    elif current_gesture == gesture_key[4]:
-                        current_queue_name = "queue3"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        # print("Activated next track!")
-                        send_message_to_file("Activated next track!")
-                        continue
-                    elif current_gesture == gesture_key[3]:
-                        current_queue_name = "queue4"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        # print("Activated previous track!")   
-                        send_message_to_file("Activated previous track!")
-                        continue   
-                elif volume_mode and activated and last_gesture != current_gesture:
-                    if current_gesture == gesture_key[4]:
-                        pyautogui.press('volumeup')
-                        send_message_to_file("Volume up")
-                        continue
-                        
-                    elif current_gesture == gesture_key[3]:
-                        pyautogui.press('volumedown')
-                        send_message_to_file("Volume down")
-                        continue
-                    
-                    if gesture_queue and current_gesture == gesture_queue[0]:
-                        gesture_queue.pop(0)
-
-                    elif not gesture_queue:
-                        volume_mode = False
-                        activated = False
-                        last_gesture = None
-                        gesture_queue = []
-                        current_queue_name = None
-                        # print("Turned off volume control mode!")
-                        send_message_to_file("Turned off volume control mode!")
-                        time.sleep(2)
-                        continue
-                elif activated and gesture_queue and last_gesture is None:
-                    if current_gesture == gesture_queue[0]:
-                        gesture_queue.pop(0)
-                        # print(f"Correct gesture detected, remaining: {gesture_queue}")
-
-                    if not gesture_queue:
-                        if current_queue_name == "queue1":
-                            send_play_pause()
-                        elif current_queue_name == "queue2":
-                            subprocess.Popen(['start', 'mswindowsmusic:'], shell=True)
-                        elif current_queue_name == "queue3":
-                            win32api.keybd_event(win32con.VK_MEDIA_NEXT_TRACK, 0, 0, 0)
-                            win32api.keybd_event(win32con.VK_MEDIA_NEXT_TRACK, 0, win32con.KEYEVENTF_KEYUP, 0)
-                        elif current_queue_name == "queue4":
-                            win32api.keybd_event(win32con.VK_MEDIA_PREV_TRACK, 0, 0, 0)
-                            win32api.keybd_event(win32con.VK_MEDIA_PREV_TRACK, 0, win32con.KEYEVENTF_KEYUP, 0)
-
-                        activated = False
-                        gesture_queue = []
-                        current_queue_name = None
-                        queue_start_time = None
-                # endregion
-
-                # region display recognized gesture
-                gesture_name = GESTURES.get(current_gesture, "Unknown")
-                y_pos = 30 + idx * 40  # Each hand is 40px apart vertically
-                cv2.putText(frame, f"Hand {idx+1}: {gesture_name}", (10, y_pos),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                # endregion
-        else:
-            # Hide window if no hand detected
-            if window_visible:
-                win32gui.ShowWindow(window, win32con.SW_HIDE)
-                window_visible = False
-            last_gesture = None
-        # endregion
+    mode = 'VIDEO'
 
-        cv2.imshow(window_name, frame)
-        
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-        
-        with open('mode_config.json', 'r') as f:
-            config = json.load(f)
-            if config.get('current_mode') == 'SLIDE':
-                print("Switching to slide control mode.")
-                break
+class SlideModeHandler(SequenceModeHandler):
+    """Gesture sequences of SLIDE mode (next/previous slide)"""
 
-    cap.release()
-    cv2.destroyAllWindows()
-
-def control_slide():
-    # region initialize MediaPipe
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        max_num_hands=1,
-        min_detection_confidence=0.8,
-        min_tracking_confidence=0.9)
-    mp_draw = mp.solutions.drawing_utils
-    #endregion
+    mode = 'SLIDE'
+    # Used to be a 50 ms sleep after every frame
+    step_interval = 0.05
 
-    # region gui camera
-    # Initialize camera
-    cap = cv2.VideoCapture(0)
-
-    # Create and position window without title bar and shadow
-    window_name = 'Gesture Control'
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    hwnd = win32gui.FindWindow(None, window_name)
-    
-    # Remove window border, title bar, and shadow
-    style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-    style = style & ~(win32con.WS_CAPTION | win32con.WS_THICKFRAME | 
-                     win32con.WS_MINIMIZEBOX | win32con.WS_MAXIMIZEBOX | win32con.WS_SYSMENU)
-    win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
-    
-    # Remove extended window styles (including shadow)
-    ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-    ex_style = ex_style & ~(win32con.WS_EX_DLGMODALFRAME | win32con.WS_EX_CLIENTEDGE | 
-                           win32con.WS_EX_STATICEDGE | win32con.WS_EX_WINDOWEDGE)
-    win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex_style)
-    
-    # Get screen resolution
-    screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-    screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-
-    # Set window size
-    window_width = 320
-    window_height = 240
-    
-    # Calculate position (e.g., top-right corner with 20px margin)
-    pos_x = (screen_width - window_width) // 2
-    pos_y = 20
-
-    # Set window position and size
-    win32gui.SetWindowPos(hwnd, 
-                         win32con.HWND_TOPMOST,  # Changed to HWND_TOPMOST to keep window on top
-                         pos_x, pos_y,
-                         window_width, window_height,
-                         win32con.SWP_SHOWWINDOW)
-    #endregion
+MODE_HANDLERS = {
+    'VIDEO': VideoModeHandler,
+    'SLIDE': SlideModeHandler,
+}
 
-    # region Control variables
-    window_visible = False
-    gesture_key = list(GESTURES)
+def read_current_mode():
+    with open('mode_config.json', 'r') as f:
+        config = json.load(f)
+        return config.get('current_mode', 'VIDEO')
+
+# Returned by act_on_frame while the mode keeps running
+CONTINUE = 'CONTINUE'
+
+# Warm restarts of the frame loop inside this process (the model stays loaded)
+recovery = RestartStats()
+restart_backoff = Backoff(initial=0.5, maximum=10.0, reset_after=30.0)
+# Sends heartbeats to the supervisor in main.py when connected to the message bus
+heartbeat = None
+
+def classify_hands(results):
+    """Classification stage: gestures of the frame's hands, or None when no hand is tracked"""
+    if results.multi_hand_landmarks:
+        # Classify every detected hand in one batch
+        predicted_gestures, _ = predict_gestures(results.multi_hand_landmarks)
+        return predicted_gestures
+    if motion_gate is not None:
+        motion_gate.reset()
+    return None
+
+def act_on_frame(session, handler, frame, results, predicted_gestures, rate_reporter):
+    """Action stage: advance the gesture sequences, draw the preview, check for a mode switch.
+
+    Returns CONTINUE, or the outcome of run_mode.
+    """
+    now = clock()
+    rate_reporter.tick(now)
+    if heartbeat is not None:
+        heartbeat.beat()
+    if recovery.down:
+        print(f"Gesture loop recovered in {recovery.recovered() * 1000:.0f} ms "
+              f"({recovery.restarts} warm restarts, {recovery.downtime:.1f} s down in total).")
+    if session.switch_started is not None:
+        print(f"Mode switch to {handler.mode} took {(now - session.switch_started) * 1000:.1f} ms.")
+        session.switch_started = None
+
+    # region timeout check queue
+    started = time.perf_counter()
+    handler.check_timeout(now)
+    # Time spent in the sequence engine and in drawing, recorded once per frame
+    matching = time.perf_counter() - started
+    drawing = 0.0
     # endregion
 
-    # region test gesture
-    queue_templates = {
-        "queue1": [gesture_key[1], gesture_key[0]],
-        "queue2": [gesture_key[1], gesture_key[0]]
-    }
-    current_queue_name = None
-    gesture_queue = []
-    activated = False
-    queue_start_time = None
-    timeout = 5  # seconds
+    # region when tracking hands
+    if results.multi_hand_landmarks:
+        # Show window if currently hidden
+        session.set_window_visible(True)
+
+        # Skip all drawing when nobody can see the preview
+        rendering = session.rendering
+        # Gestures are still shown but not acted on during a cooldown
+        accepting = handler.accepts_gestures(now)
+
+        for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
+            # region Draw landmarks and Predict gesture
+            if rendering:
+                started = time.perf_counter()
+                session.draw_landmarks(frame, hand_landmarks)
+                drawing += time.perf_counter() - started
+            current_gesture = predicted_gestures[idx]
+            # endregion
+
+            # region trigger gesture
+            if accepting:
+                started = time.perf_counter()
+                consumed = handler.on_gesture(current_gesture)
+                matching += time.perf_counter() - started
+                if consumed:
+                    continue
+            # endregion
+
+            # region display recognized gesture
+            if rendering:
+                started = time.perf_counter()
+                draw_gesture_text(frame, idx, GESTURES.get(current_gesture, "Unknown"))
+                drawing += time.perf_counter() - started
+            # endregion
+    else:
+        # Hide window if no hand detected
+        session.set_window_visible(False)
+        handler.on_no_hand()
     # endregion
 
+    started = time.perf_counter()
+    if METRICS_OVERLAY and session.rendering:
+        draw_stage_metrics(frame, metrics.latest)
+    # Includes the window's event pump (cv2.waitKey)
+    key = session.show(frame)
+    if metrics is not None:
+        metrics.add('sequence_matching', matching)
+        metrics.add('rendering', drawing + time.perf_counter() - started)
+    if key & 0xFF == ord('q') or session.stop_requested:
+        return None
+
+    next_mode = session.requested_mode() or handler.mode
+    if next_mode != handler.mode and next_mode in MODE_HANDLERS:
+        print(f"Switching to {next_mode.lower()} control mode.")
+        session.switch_started = clock()
+        return next_mode
+    if session.config_changed():
+        # Restart the mode with the new gesture mappings (camera and model stay loaded)
+        print("config.json changed, reloading gesture mappings.")
+        return handler.mode
+    return CONTINUE
+
+def run_mode(session, handler):
+    """Run the frame loop for one mode on an open session.
+
+    Returns the next mode when mode_config.json switches to another mode,
+    the same mode when config.json changes, 'CAPTURE_FAILED' when the camera stops delivering frames and None when
+    'q' is pressed. With "pipeline" enabled in config.json the stages run on
+    separate threads (run_mode_pipelined), otherwise one after another.
+    """
+    session.configure(get_max_num_hands(handler.mode))
+    rate_reporter = RateReporter(motion_gate, RATE_REPORT_INTERVAL, session.cap, session.governor)
+    if session.pipelined:
+        return run_mode_pipelined(session, handler, rate_reporter)
+
     while True:
         # region read frame
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Process frame
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
-        
-        # Get window handle
-        window = win32gui.FindWindow(None, window_name)
+        frame, results = session.read()
+        if frame is None:
+            return 'CAPTURE_FAILED'
         # endregion
-
-        # region timeout check queue
-        # Check timeout at the beginning of the loop (if activated)
-        if activated and queue_start_time is not None:
-            if time.time() - queue_start_time > timeout:
-                send_message_to_file("Time out! Canceling action.")
-                gesture_queue = []
-                activated = False
-                queue_start_time = None
-                current_queue_name = None
-        # endregion
-
-        # region when tracking hands
-        if results.multi_hand_landmarks:
-            # Show window if currently hidden
-            if not window_visible:
-                win32gui.ShowWindow(window, win32con.SW_SHOW)
-                window_visible = True
-
-            for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # region Draw landmarks and Predict gesture
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                current_gesture = predict_gesture(hand_landmarks)
-                # endregion
-
-                # region trigger gesture 
-                if not activated:
-                    if current_gesture == gesture_key[1]:
-                        current_queue_name = "queue1"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        send_message_to_file("Activated next slide!")
-                        continue
-                    elif current_gesture == gesture_key[2]:
-                        current_queue_name = "queue2"
-                        gesture_queue = queue_templates[current_queue_name].copy()
-                        activated = True
-                        queue_start_time = time.time()
-                        send_message_to_file("Activated previous slide!")
-                        continue
-
-                elif activated and gesture_queue:
-                    if current_gesture == gesture_queue[0]:
-                        gesture_queue.pop(0)
-
-                    if not gesture_queue:
-                        if current_queue_name == "queue1":
-                            send_message_to_file("Activated next slide!")
-                            if focus_powerpoint_slideshow():
-                                win32api.keybd_event(win32con.VK_RIGHT, 0, 0, 0)
-                                win32api.keybd_event(win32con.VK_RIGHT, 0, win32con.KEYEVENTF_KEYUP, 0)
-                            else:
-                                send_message_to_file("Could not find PowerPoint Slide Show window!")
-                        elif current_queue_name == "queue2":
-                            send_message_to_file("Activated previous slide!")
-                            if focus_powerpoint_slideshow():
-                                win32api.keybd_event(win32con.VK_LEFT, 0, 0, 0)
-                                win32api.keybd_event(win32con.VK_LEFT, 0, win32con.KEYEVENTF_KEYUP, 0)
-                            else:
-                                send_message_to_file("Could not find PowerPoint Slide Show window!")
-
-                        activated = False
-                        gesture_queue = []
-                        current_queue_name = None
-                        queue_start_time = None
-                # endregion
-
-                # region display recognized gesture
-                gesture_name = GESTURES.get(current_gesture, "Unknown")
-                y_pos = 30 + idx * 40  # Each hand is 40px apart vertically
-                cv2.putText(frame, f"Hand {idx+1}: {gesture_name}", (10, y_pos),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                # endregion
-        else:
-            # Hide window if no hand detected
-            if window_visible:
-                win32gui.ShowWindow(window, win32con.SW_HIDE)
-                window_visible = False
-            last_gesture = None
-        # endregion
-
-        cv2.imshow(window_name, frame)
-        
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        with open('mode_config.json', 'r') as f:
-            config = json.load(f)
-            if config.get('current_mode') == 'VIDEO':
-                print("Switching to video control mode.")
-                break
-        time.sleep(0.05)
-    
-    cap.release()
-    cv2.destroyAllWindows()
-
-def system_control():
-    global GESTURES
+        outcome = act_on_frame(session, handler, frame, results, classify_hands(results), rate_reporter)
+        session.recycle(frame)
+        if outcome != CONTINUE:
+            return outcome
+
+def run_mode_pipelined(session, handler, rate_reporter):
+    """run_mode with capture, landmarks and classification on their own worker threads.
+
+    The stages are the same functions the sequential loop calls, connected
+    by bounded queues; frames may be dropped under load but are acted on in
+    capture order. The action stage runs on this thread because the OpenCV
+    preview window belongs to it.
+    """
+    def detect(frame):
+        return session.detect(frame)
+
+    def classify(item):
+        frame, results = item
+        return frame, results, classify_hands(results)
+
+    def recycle_item(item):
+        session.recycle(item[0])
+
+    # Frames dropped by a queue go back to the pool like the ones acted on
+    pipeline = Pipeline(session.grab, [('landmarks', detect), ('classify', classify)],
+                        queue_size=int(PIPELINE_CONFIG.get('queue_size', 2)),
+                        policies=PIPELINE_CONFIG.get('policies'),
+                        on_drop={'source': session.recycle, 'landmarks': recycle_item, 'classify': recycle_item})
+    try:
+        for frame, results, predicted_gestures in pipeline:
+            outcome = act_on_frame(session, handler, frame, results, predicted_gestures, rate_reporter)
+            session.recycle(frame)
+            if outcome != CONTINUE:
+                return outcome
+        return 'CAPTURE_FAILED'
+    finally:
+        pipeline.stop()
+        print(f"Pipeline frames dropped per queue: {pipeline.stats()}")
+
+def control_video(session=None):
+    owns_session = session is None
+    session = session or CaptureSession()
+    try:
+        return run_mode(session, VideoModeHandler())
+    finally:
+        if owns_session:
+            session.close()
+
+def control_slide(session=None):
+    owns_session = session is None
+    session = session or CaptureSession()
+    try:
+        return run_mode(session, SlideModeHandler())
+    finally:
+        if owns_session:
+            session.close()
+
+def wait_for_restart(delay, stop):
+    """Sleep before a restart, still sending heartbeats; returns early on shutdown"""
+    deadline = time.monotonic() + delay
+    while not stop.is_set():
+        if heartbeat is not None:
+            heartbeat.beat()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        stop.wait(min(remaining, 0.5))
+
+def system_control(bus=None):
+    global GESTURES, heartbeat, dispatcher
+    endpoint = message_bus.connect(bus, 'control')
+    if model is None and not init_model():
+        return
     ensure_mode_config() 
-    while True:
+    # Parse mode_config.json and config.json only when they change, instead of every frame
+    watcher = ConfigWatcher(CONFIG_WATCH_INTERVAL)
+    config_file = watcher.watch('config.json')
+    profile_switch = ProfileSwitch(float(PROFILING_CONFIG.get('interval', 0.01)),
+                                   PROFILING_CONFIG.get('dir', PROFILE_DIR))
+    profile_switch.request_from_env()
+    watcher.watch(REQUEST_FILE_PATH, profile_switch.request_from_file)
+    # Set on shutdown; survives the session being rebuilt after a crash
+    stop = threading.Event()
+    if endpoint is not None:
+        # Mode changes and shutdown arrive over the message bus
         try:
-            with open('mode_config.json', 'r') as f:
-                config = json.load(f)
-                current_mode = config.get('current_mode', 'VIDEO')
+            initial = {'current_mode': read_current_mode()}
         except Exception:
-            with open('mode_config.json', 'w', encoding='utf-8') as f:
-                json.dump({"current_mode": "VIDEO"}, f, ensure_ascii=False, indent=4)
-            current_mode = 'VIDEO'
-
-        if current_mode == 'VIDEO':
-            GESTURES = get_gesture_mappings('VIDEO')    
-            control_video()
-        elif current_mode == 'SLIDE':
-            GESTURES = get_gesture_mappings('SLIDE')
-            control_slide()
\ No newline at end of file
+            initial = {'current_mode': 'VIDEO'}
+        mode_file = endpoint.slot(message_bus.MODE, initial)
+        heartbeat = Heartbeat(endpoint, 'control')
+    else:
+        mode_file = watcher.watch('mode_config.json')
+    watcher.start()
+    actions_config = get_runtime_config().get('actions', {})
+    set_action_backend(make_backend(get_runtime_config().get('action_backend', 'auto')))
+    dispatcher = ActionDispatcher(perform_action, debounce=float(actions_config.get('debounce', 0.2)),
+                                  on_failure=report_failed_action,
+                                  on_done=(lambda name, seconds: metrics.add('action_dispatch', seconds))
+                                  if metrics is not None else None)
+    exporter = None
+    if metrics is not None:
+        exporter = MetricsExporter(metrics, METRICS_CONFIG.get('path', 'stage_metrics.json'),
+                                   float(METRICS_CONFIG.get('export_interval', 5)),
+                                   METRICS_CONFIG.get('format', 'json')).start()
+
+    def open_session():
+        # One camera/MediaPipe session shared by every mode; rebuilt only after a crash
+        session = CaptureSession()
+        session.config_file = config_file
+        session.mode_file = mode_file
+        session.stop_requested = stop.is_set()
+        return session
+
+    def request_stop(_):
+        stop.set()
+        session.stop_requested = True
+
+    session = open_session()
+    if endpoint is not None:
+        endpoint.on(message_bus.SHUTDOWN, request_stop)
+        endpoint.listen()
+    try:
+        while not stop.is_set():
+            current_mode = session.requested_mode()
+            if current_mode is None:
+                with open('mode_config.json', 'w', encoding='utf-8') as f:
+                    json.dump({"current_mode": "VIDEO"}, f, ensure_ascii=False, indent=4)
+                watcher.check()
+                current_mode = 'VIDEO'
+            if current_mode not in MODE_HANDLERS:
+                current_mode = 'VIDEO'
+
+            # Pick up a retrained model; the prediction cache invalidates itself on reload
+            reload_model_if_changed()
+
+            session.config_version = config_file.version
+            GESTURES = mappings_from_config(config_file.value or {}, current_mode)
+            sequences = sequences_from_config(config_file.value or {}, current_mode)
+            try:
+                outcome = run_mode(session, MODE_HANDLERS[current_mode](sequences=sequences))
+            except Exception:
+                # Warm restart: rebuild the camera/MediaPipe session, keep the model and config
+                traceback.print_exc()
+                recovery.failed()
+                delay = restart_backoff.next()
+                print(f"Gesture loop crashed, restarting it in {delay:.1f} s.")
+                session.close()
+                wait_for_restart(delay, stop)
+                session = open_session()
+                continue
+            if session.stop_requested:
+                print("Received stop command from the message bus.")
+                break
+            if outcome == 'CAPTURE_FAILED':
+                # e.g. camera unplugged: retry with backoff instead of spinning on open
+                recovery.failed()
+                delay = restart_backoff.next()
+                print(f"Camera stopped delivering frames, reopening it in {delay:.1f} s.")
+                wait_for_restart(delay, stop)
+                session.reopen_capture()
+
+            if prediction_cache is not None:
+                print(f"Prediction cache: {prediction_cache.stats()}")
+    finally:
+        watcher.stop()
+        profile_switch.stop()
+        print(f"Config watcher: {watcher.stat_calls} stat calls, {watcher.parses} parses.")
+        print(f"Warm restarts: {recovery.as_dict()}")
+        dispatcher.close()
+        print(f"Actions: {dispatcher.stats()}")
+        if exporter is not None:
+            exporter.stop()
+            print(f"Stage latency written to '{exporter.path}' "
+                  f"(instrumentation overhead {metrics.latest['overhead_pct']:.3f}%).")
+        if session.governor is not None:
+            print(session.governor.summary())
+        session.close()
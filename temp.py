@@ -1,10 +1,11 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import tensorflow as tf
 import joblib
 import os
 import time # Thêm để sử dụng time.sleep
+from gesture_inference import DenseGestureModel
+from landmark_utils import LandmarkBuffer
 
 # --- Cấu hình đường dẫn đến file mô hình và scaler ---
 MODEL_PATH = 'gesture_recognition_model.h5'
@@ -31,7 +32,7 @@ if not os.path.exists(MODEL_PATH) or not os.path.exists(SCALER_PATH):
     exit()
 
 try:
-    model = tf.keras.models.load_model(MODEL_PATH)
+    model = DenseGestureModel.from_h5(MODEL_PATH) # Chạy bằng NumPy, không cần TensorFlow
     scaler = joblib.load(SCALER_PATH) # Sử dụng joblib.load() như bạn đã lưu
     print(f"Đã tải mô hình thành công từ '{MODEL_PATH}' và scaler từ '{SCALER_PATH}'.")
 except Exception as e:
@@ -49,26 +50,27 @@ hands = mp_hands.Hands(
 )
 mp_drawing = mp.solutions.drawing_utils
 
+# --- Bộ đệm đặc trưng dùng lại cho mỗi frame ---
+landmark_buffer = LandmarkBuffer(max_hands=1)
+
 # --- Hàm dự đoán cử chỉ ---
 def predict_gesture(landmarks):
     """
     Chuyển đổi các mốc (landmarks) của bàn tay thành định dạng đầu vào của mô hình
     và dự đoán cử chỉ.
     """
-    # Làm phẳng dữ liệu mốc thành mảng 1D (x, y, z cho mỗi mốc)
-    row = []
-    for landmark in landmarks.landmark:
-        row.extend([landmark.x, landmark.y, landmark.z])
+    # Làm phẳng dữ liệu mốc vào bộ đệm dùng lại (1, 63) (x, y, z cho mỗi mốc)
+    row = landmark_buffer.fill_one(landmarks)
     
     # Chuẩn hóa các đặc trưng bằng scaler đã tải
     # Đảm bảo số lượng đặc trưng khớp với scaler của bạn
     try:
-        if len(row) != scaler.n_features_in_:
+        if row.shape[1] != scaler.n_features_in_:
             # Điều này xảy ra nếu bạn huấn luyện mô hình với số lượng mốc/chiều khác nhau
-            print(f"Cảnh báo: Số lượng đặc trưng không khớp giữa dữ liệu hiện tại ({len(row)}) và scaler ({scaler.n_features_in_}). Bỏ qua dự đoán.")
+            print(f"Cảnh báo: Số lượng đặc trưng không khớp giữa dữ liệu hiện tại ({row.shape[1]}) và scaler ({scaler.n_features_in_}). Bỏ qua dự đoán.")
             return -1 # Trả về giá trị đặc biệt để biểu thị lỗi
         
-        scaled_row = scaler.transform([row])
+        scaled_row = scaler.transform(row)
         
         # Dự đoán bằng mô hình
         prediction = model.predict(scaled_row)
@@ -7,11 +7,13 @@ from tensorflow.keras.layers import Dense, Dropout # type: ignore
 from tensorflow.keras.utils import to_categorical # type: ignore
 import numpy as np
 import joblib 
+from gesture_inference import dense_layers_from_keras, export_fused_model, DenseGestureModel
 
 # --- config ---
 csv_file_name = 'gesture_data_auto_record.csv' 
 model_save_path = 'gesture_recognition_model.h5'
 scaler_save_path = 'scaler.pkl'
+fused_model_save_path = 'gesture_model.npz'
 
 # --- load data ---
 try:
@@ -69,4 +71,16 @@ print(f"\nTest set accuracy: {accuracy:.4f}")
 
 model.save(model_save_path)
 print(f"Model saved at: {model_save_path}")
-print(f"Scaler saved at: {scaler_save_path}")
\ No newline at end of file
+print(f"Scaler saved at: {scaler_save_path}")
+
+# --- Export fused model (scaler folded into the first layer) ---
+export_fused_model(dense_layers_from_keras(model), scaler.mean_, scaler.scale_, fused_model_save_path)
+print(f"Fused model saved at: {fused_model_save_path}")
+
+# Check the fused model against Keras on the test set (X_test is already scaled)
+X_test_raw = scaler.inverse_transform(X_test)
+keras_prob = model.predict(X_test, verbose=0)
+fused_prob = DenseGestureModel.from_npz(fused_model_save_path).predict(X_test_raw)
+max_diff = np.abs(keras_prob - fused_prob).max()
+agreement = np.mean(np.argmax(keras_prob, axis=1) == np.argmax(fused_prob, axis=1))
+print(f"Fused model check: max |p_keras - p_fused| = {max_diff:.2e}, argmax agreement = {agreement:.4f}")